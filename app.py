@@ -5,6 +5,8 @@ from config import Config
 app = create_app()
 
 if __name__ == '__main__':
+    from cleanup_worker import cleanup_worker
+    cleanup_worker.ensure_running()
     port = Config.PORT
     debug = Config.DEBUG
     app.run(debug=debug, host='0.0.0.0', port=port)
\ No newline at end of file
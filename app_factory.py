@@ -1,16 +1,23 @@
-from flask import Flask, jsonify, send_from_directory
+from flask import Flask, jsonify, request
 from flask_cors import CORS
 import os
-import openai
+import time
 from config import Config
-from database import init_db, get_db
+from database import init_db, get_db, pool_stats, mongo_client_options
+from storage.base import LocalDatabase
 from routes.users import users_bp
 from routes.goals import goals_bp
 from routes.analytics import analytics_bp
 from routes.chat import chat_bp, init_ai
+from routes.metrics import metrics_bp
+from utils.metrics import http_request_duration
+from utils.static_files import StaticAssets
 
 def create_app():
-    app = Flask(__name__, static_folder=Config.STATIC_FOLDER, static_url_path=Config.STATIC_URL_PATH)
+    # The React build is served by StaticAssets below rather than Flask's static route
+    app = Flask(__name__, static_folder=None)
+    static_assets = StaticAssets(os.path.join(app.root_path, Config.STATIC_FOLDER),
+                                 inline_max=Config.STATIC_INLINE_MAX, precompress=Config.STATIC_PRECOMPRESS)
     
     # Configure app
     app.config.from_object(Config)
@@ -18,9 +25,6 @@ def create_app():
     # Enable CORS
     CORS(app)
     
-    # Set OpenAI API key
-    openai.api_key = Config.OPENAI_API_KEY
-    
     # Initialize database
     init_db()
     
@@ -32,6 +36,23 @@ def create_app():
     app.register_blueprint(goals_bp)
     app.register_blueprint(analytics_bp)
     app.register_blueprint(chat_bp)
+    app.register_blueprint(metrics_bp)
+    
+    # Request latency per route template for /api/metrics
+    # (one proxy lookup per hook; attribute access through the request proxy costs ~1us each)
+    @app.before_request
+    def start_timer():
+        request._get_current_object().environ['finbuddy.started'] = time.perf_counter()
+    
+    @app.after_request
+    def record_latency(response):
+        current = request._get_current_object()
+        started = current.environ.get('finbuddy.started')
+        if started is not None:
+            rule = current.url_rule
+            http_request_duration.observe(time.perf_counter() - started, current.method,
+                                          rule.rule if rule is not None else 'unmatched', response.status_code)
+        return response
     
     # Basic routes
     @app.route('/')
@@ -50,37 +71,40 @@ def create_app():
     def debug_collections():
         try:
             db = get_db()
-            if isinstance(db, dict):
-                return jsonify({
-                    "storage_type": "fallback",
-                    "users_count": len(db['users']),
-                    "goals_count": len(db['goals']),
-                    "learning_progress_count": len(db['learning_progress'])
-                })
-            else:
-                return jsonify({
-                    "storage_type": "mongodb",
-                    "users_count": db.users.count_documents({}),
-                    "goals_count": db.goals.count_documents({}),
-                    "learning_progress_count": db.learning_progress.count_documents({})
-                })
+            return jsonify({
+                "storage_type": "fallback" if isinstance(db, LocalDatabase) else "mongodb",
+                "users_count": db.users.count_documents({}),
+                "goals_count": db.goals.count_documents({}),
+                "learning_progress_count": db.learning_progress.count_documents({})
+            })
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
+    @app.route('/api/debug/pool-stats', methods=['GET'])
+    def debug_pool_stats():
+        if isinstance(get_db(), LocalDatabase):
+            return jsonify({"storage_type": "fallback"})
+        return jsonify({
+            "storage_type": "mongodb",
+            "options": mongo_client_options(),
+            "pool": pool_stats.stats()
+        })
+
     # Serve React App
     @app.route('/', defaults={'path': ''})
     @app.route('/<path:path>')
     def serve_react_app(path):
-        try:
-            if path != "" and os.path.exists(app.static_folder + '/' + path):
-                return send_from_directory(app.static_folder, path)
-            else:
-                return send_from_directory(app.static_folder, 'index.html')
-        except:
+        asset = static_assets.lookup(path)
+        if asset is None:
             return jsonify({
                 "message": "FinBuddy API is running!", 
                 "frontend": "Build the React app first: cd frontend && npm run build",
                 "version": "1.0"
             })
+        return static_assets.response(asset, request)
+    
+    @app.route('/api/debug/static-stats', methods=['GET'])
+    def static_stats():
+        return jsonify(static_assets.stats())
     
     return app
\ No newline at end of file
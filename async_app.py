@@ -0,0 +1,137 @@
+"""
+FinBuddy async (ASGI) serving mode
+
+Chat and analytics run as async Quart handlers on pymongo's asyncio driver and
+the LLM's async API, so one process can keep hundreds of slow chat/analytics
+requests in flight. Every other endpoint is served by the regular Flask app,
+mounted through an ASGI-to-WSGI bridge, so the blueprints stay the single
+source of truth.
+
+Run with:  hypercorn async_app:app --bind 0.0.0.0:5000
+       or: python async_app.py
+"""
+
+import asyncio
+from asgiref.wsgi import WsgiToAsgi
+from quart import Quart, Response, request, jsonify
+from app_factory import create_app
+from config import Config
+from database import init_async_db, get_user_with_goals_async, get_user_with_totals_async
+from routes.analytics import (
+    InvalidQuery, time_series_query, forecast_query, insights_query, serialize, set_cache_headers
+)
+from routes.chat import agenerate_reply, astream_reply, session_key, SSE_HEADERS
+from utils.cache import analytics_cache
+
+ASYNC_PATHS = ('/api/chat', '/api/chat/stream')
+ASYNC_PATH_PREFIXES = ('/api/analytics/time-series/', '/api/analytics/forecast/', '/api/analytics/insights/')
+
+async def analytics_response(user_id, query, load=get_user_with_goals_async):
+    try:
+        cache_key, build = query(user_id, request.args)
+        cached = analytics_cache.get(cache_key)
+        if cached is None:
+            user, user_goals = await load(user_id)
+
+            if not user:
+                return jsonify({"error": "User not found"}), 404
+
+            # Generators are CPU-bound (Monte Carlo especially); keep them off the event loop
+            payload = await asyncio.to_thread(lambda: serialize(build(user, user_goals)))
+            cached = analytics_cache.set(cache_key, payload)
+
+        body, etag = cached
+        response = set_cache_headers(Response(body, mimetype='application/json'), etag)
+        return await response.make_conditional(request)
+    except InvalidQuery as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def create_quart_app():
+    app = Quart(__name__)
+    app.config.from_object(Config)
+
+    @app.before_serving
+    async def open_async_db():
+        init_async_db()
+
+    @app.route('/api/analytics/time-series/<user_id>', methods=['GET'])
+    async def get_time_series_data(user_id):
+        return await analytics_response(user_id, time_series_query)
+
+    @app.route('/api/analytics/forecast/<user_id>', methods=['GET'])
+    async def get_forecast_data(user_id):
+        return await analytics_response(user_id, forecast_query)
+
+    @app.route('/api/analytics/insights/<user_id>', methods=['GET'])
+    async def get_user_insights(user_id):
+        return await analytics_response(user_id, insights_query, load=get_user_with_totals_async)
+
+    @app.route('/api/chat', methods=['POST'])
+    async def chat():
+        try:
+            data = await request.get_json()
+            message = data.get('message', '')
+            user_context = data.get('user_context', {})
+
+            response, usage = await agenerate_reply(
+                message, user_context, session_key(data, user_context, request.remote_addr)
+            )
+
+            return jsonify({
+                "message": response,
+                **usage,
+                "status": "success"
+            })
+        except Exception as e:
+            return jsonify({"error": str(e), "status": "error"}), 500
+
+    @app.route('/api/chat/stream', methods=['POST'])
+    async def chat_stream():
+        try:
+            data = await request.get_json()
+            message = data.get('message', '')
+            user_context = data.get('user_context', {})
+            session_id = session_key(data, user_context, request.remote_addr)
+
+            return Response(astream_reply(message, user_context, session_id),
+                            mimetype='text/event-stream', headers=SSE_HEADERS)
+        except Exception as e:
+            return jsonify({"error": str(e), "status": "error"}), 500
+
+    @app.after_request
+    async def allow_cors(response):
+        # Matches flask-cors' defaults on the sync app
+        response.headers.setdefault('Access-Control-Allow-Origin', '*')
+        return response
+
+    return app
+
+def create_async_app():
+    """ASGI app routing async paths to Quart and everything else to the Flask app"""
+    flask_app = create_app()
+    quart_app = create_quart_app()
+    wsgi_app = WsgiToAsgi(flask_app)
+
+    async def dispatch(scope, receive, send):
+        # CORS preflights stay with flask-cors on the Flask app
+        if scope['type'] != 'http' or (
+            scope['method'] != 'OPTIONS'
+            and (scope['path'] in ASYNC_PATHS or scope['path'].startswith(ASYNC_PATH_PREFIXES))
+        ):
+            await quart_app(scope, receive, send)
+        else:
+            await wsgi_app(scope, receive, send)
+
+    return dispatch
+
+app = create_async_app()
+
+if __name__ == '__main__':
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config as HypercornConfig
+
+    hypercorn_config = HypercornConfig()
+    hypercorn_config.bind = [f"0.0.0.0:{Config.PORT}"]
+    asyncio.run(serve(app, hypercorn_config))
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Sync vs async serving load test
+Fires bursts of concurrent /api/chat requests at the Flask app (served from a
+fixed pool of worker threads, like one sync worker) and at the async ASGI app,
+with the LLM replaced by a local stub that takes --llm-delay seconds.
+
+Usage: python benchmarks/bench_async_vs_sync.py [--concurrency 50 200] [--llm-delay 0.5]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+class StubLLM:
+    """Stands in for the OpenAI LLM: sleeps like a remote completion call"""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def invoke(self, prompt):
+        time.sleep(self.delay)
+        return "stub answer"
+
+    async def ainvoke(self, prompt):
+        await asyncio.sleep(self.delay)
+        return "stub answer"
+
+def serve_sync(port, threads, delay):
+    from werkzeug.serving import BaseWSGIServer
+    from app_factory import create_app
+    import routes.chat
+    
+    class PooledWSGIServer(BaseWSGIServer):
+        request_queue_size = 1024
+        
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self._pool = ThreadPoolExecutor(threads)
+        
+        def process_request(self, request, client_address):
+            self._pool.submit(self._handle, request, client_address)
+        
+        def _handle(self, request, client_address):
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+    
+    app = create_app()
+    routes.chat.llm = StubLLM(delay)
+    PooledWSGIServer('127.0.0.1', port, app).serve_forever()
+
+def serve_async(port, delay):
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config as HypercornConfig
+    from async_app import app
+    import routes.chat
+    
+    routes.chat.llm = StubLLM(delay)
+    config = HypercornConfig()
+    config.bind = [f"127.0.0.1:{port}"]
+    config.backlog = 1024
+    config.accesslog = None
+    asyncio.run(serve(app, config))
+
+async def post_chat(port):
+    body = json.dumps({"message": "how should I start a SIP?", "user_context": {"status": "student"}}).encode()
+    started = time.perf_counter()
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(
+        f"POST /api/chat HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    ok = response.startswith(b"HTTP/1.1 200") or response.startswith(b"HTTP/1.0 200")
+    return ok, time.perf_counter() - started
+
+async def burst(port, concurrency):
+    started = time.perf_counter()
+    results = await asyncio.gather(*(post_chat(port) for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    latencies = sorted(latency for _, latency in results)
+    ok = sum(1 for success, _ in results if success)
+    return ok, wall, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95) - 1]
+
+async def wait_for(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            _, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not start")
+
+def run_mode(label, target, args, port, levels):
+    proc = multiprocessing.Process(target=target, args=args, daemon=True)
+    proc.start()
+    try:
+        asyncio.run(wait_for(port))
+        for concurrency in levels:
+            ok, wall, p50, p95 = asyncio.run(burst(port, concurrency))
+            print(f"{label:<24} {concurrency:>5} in flight: {ok}/{concurrency} ok, wall {wall:6.2f}s, "
+                  f"{ok / wall:7.1f} req/s, p50 {p50:5.2f}s, p95 {p95:5.2f}s")
+    finally:
+        proc.terminate()
+        proc.join()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[50, 200])
+    parser.add_argument('--llm-delay', type=float, default=0.5)
+    parser.add_argument('--sync-threads', type=int, default=16)
+    args = parser.parse_args()
+    
+    os.environ.setdefault('MONGO_SERVER_SELECTION_TIMEOUT_MS', '200')
+    run_mode(f"sync ({args.sync_threads} threads)", serve_sync, (5101, args.sync_threads, args.llm_delay), 5101, args.concurrency)
+    run_mode("async (1 event loop)", serve_async, (5102, args.llm_delay), 5102, args.concurrency)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Chat time-to-first-byte benchmark
+Compares how long a client waits for the first piece of an answer from the
+buffered /api/chat endpoint and the Server-Sent Events /api/chat/stream
+endpoint, with the LLM replaced by a fake that emits --tokens tokens
+--token-delay seconds apart. The fallback stream is measured as well.
+
+Usage: python benchmarks/bench_chat_ttfb.py [--requests 20] [--tokens 60] [--token-delay 0.02]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+class FakeStreamingLLM:
+    """Produces a fixed answer token by token, like a streamed completion"""
+
+    def __init__(self, tokens, delay):
+        self.tokens = [f"word{i} " for i in range(tokens)]
+        self.delay = delay
+
+    def stream(self, prompt):
+        for token in self.tokens:
+            time.sleep(self.delay)
+            yield token
+
+    def invoke(self, prompt):
+        return "".join(self.stream(prompt))
+
+def timed_post(port, path, body):
+    """(seconds to first body byte, seconds to full body, body)"""
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    started = time.perf_counter()
+    connection.request('POST', path, body=body, headers={'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    first = response.read1(1)
+    first_byte = time.perf_counter() - started
+    rest = response.read()
+    total = time.perf_counter() - started
+    connection.close()
+    return first_byte, total, first + rest
+
+def measure(label, port, path, requests):
+    body = json.dumps({"message": "how should I start a SIP?", "session_id": "bench",
+                       "user_context": {"status": "student"}})
+    ttfb, totals = [], []
+    for _ in range(requests):
+        first_byte, total, payload = timed_post(port, path, body)
+        ttfb.append(first_byte)
+        totals.append(total)
+    print(f"{label:<28} ttfb p50 {statistics.median(ttfb) * 1000:8.1f} ms   "
+          f"full answer p50 {statistics.median(totals) * 1000:8.1f} ms   ({len(payload)} bytes)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=20)
+    parser.add_argument('--tokens', type=int, default=60)
+    parser.add_argument('--token-delay', type=float, default=0.02)
+    args = parser.parse_args()
+
+    os.environ.setdefault('MONGO_SERVER_SELECTION_TIMEOUT_MS', '200')
+    from werkzeug.serving import make_server
+    from app_factory import create_app
+    import routes.chat
+
+    app = create_app()
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    port = server.server_port
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        routes.chat.llm = FakeStreamingLLM(args.tokens, args.token_delay)
+        print(f"fake LLM: {args.tokens} tokens, {args.token_delay * 1000:.0f} ms apart")
+        measure("POST /api/chat", port, '/api/chat', args.requests)
+        measure("POST /api/chat/stream", port, '/api/chat/stream', args.requests)
+
+        routes.chat.llm = None
+        measure("fallback /api/chat", port, '/api/chat', args.requests)
+        measure("fallback /api/chat/stream", port, '/api/chat/stream', args.requests)
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Fallback response routing benchmark
+Routes a corpus of synthetic chat messages through the original chain of
+`any(word in message ...)` checks and through the compiled KeywordRouter,
+then times complete fallback answers (get_fallback_response plus JSON
+encoding) against the pre-encoded fallback_body.
+
+Usage: python benchmarks/bench_fallback_router.py [--messages 100000]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from routes.chat import FALLBACK_INTENTS, fallback_router, get_fallback_response, fallback_body
+
+FILLER = ("how", "should", "i", "my", "the", "best", "way", "to", "for", "in", "india", "this", "year",
+          "salary", "parents", "college", "what", "is", "a", "good", "monthly", "start", "with", "₹2000")
+
+def chain_route(message):
+    """The original if/elif chain: first intent with any keyword contained in the message"""
+    for intent, keywords in FALLBACK_INTENTS:
+        if any(word in message for word in keywords):
+            return intent
+    return None
+
+def make_corpus(count, seed=7):
+    rng = random.Random(seed)
+    keywords = [keyword for _, words in FALLBACK_INTENTS for keyword in words]
+    corpus = []
+    for _ in range(count):
+        words = rng.choices(FILLER, k=rng.randint(4, 18))
+        for _ in range(rng.choice((0, 1, 1, 2, 3))):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(keywords))
+        corpus.append(" ".join(words).capitalize() + "?")
+    return corpus
+
+def timed(label, fn, corpus, baseline=None):
+    started = time.perf_counter()
+    for message in corpus:
+        fn(message)
+    elapsed = time.perf_counter() - started
+    speedup = f"  ({baseline / elapsed:4.1f}x)" if baseline else ""
+    print(f"{label:<36} {elapsed:7.3f}s  {len(corpus) / elapsed:10,.0f} msg/s{speedup}")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=100000)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.messages)
+    context = {"status": "student", "monthly_income_range": "5k-15k"}
+
+    baseline = timed("if/elif any() chain (route only)", lambda m: chain_route(m.lower()), corpus)
+    timed("KeywordRouter (route only)", lambda m: fallback_router.route(m.lower()), corpus, baseline)
+
+    legacy = timed("answer + json.dumps", lambda m: json.dumps({
+        "message": get_fallback_response(m.lower(), context), "status": "success"
+    }).encode(), corpus)
+    timed("fallback_body (pre-encoded)", lambda m: fallback_body(m, context), corpus, legacy)
+
+    changed = sum(chain_route(m.lower()) != fallback_router.route(m.lower()) for m in corpus)
+    print(f"\n{changed:,} of {len(corpus):,} messages ({changed / len(corpus):.1%}) route differently: "
+          f"they mention several intents and now go to the best-scoring one instead of the first listed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Goal import throughput benchmark
+Creates N goals three ways through Flask's test client: one POST /api/goals
+per goal, one POST /api/goals/bulk with a JSON array, and one with an NDJSON
+body. It reports goals per second for each, against the local fallback store
+selected with --store (MongoDB is not contacted).
+
+Usage: python benchmarks/bench_goal_import.py [--goals 5000] [--store memory|sqlite]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+def goal_rows(user_ids, count):
+    return [{
+        "user_id": user_ids[n % len(user_ids)], "dream": "Bike", "target_amount": 100000,
+        "current_amount": 5000, "timeline_months": 24, "monthly_income": 40000
+    } for n in range(count)]
+
+def report(label, count, seconds):
+    print(f"{label:<36} {count / seconds:>10,.0f} goals/s  ({seconds:.2f}s)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--goals', type=int, default=5000)
+    parser.add_argument('--store', choices=('memory', 'sqlite'), default='memory')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ['FALLBACK_STORE'] = args.store
+    os.environ['FALLBACK_SQLITE_PATH'] = os.path.join(workdir, 'bench.db')
+    os.environ['MONGODB_URI'] = 'mongodb://127.0.0.1:1/'
+    os.environ.setdefault('MONGO_SERVER_SELECTION_TIMEOUT_MS', '100')
+    from app_factory import create_app
+
+    client = create_app().test_client()
+    # Bulk rows for unknown users are rejected, so the goals go to 200 real users
+    user_ids = [client.post('/api/user', json={"name": f"Bench {n}"}).get_json()['user_id'] for n in range(200)]
+    rows = goal_rows(user_ids, args.goals)
+
+    started = time.perf_counter()
+    for row in rows:
+        assert client.post('/api/goals', json=row).status_code == 200
+    report("POST /api/goals x N", len(rows), time.perf_counter() - started)
+
+    started = time.perf_counter()
+    result = client.post('/api/goals/bulk', json=rows).get_json()
+    report("POST /api/goals/bulk (JSON array)", result['created'], time.perf_counter() - started)
+
+    body = "".join(json.dumps(row) + "\n" for row in rows)
+    started = time.perf_counter()
+    result = client.post('/api/goals/bulk', data=body, content_type='application/x-ndjson').get_json()
+    report("POST /api/goals/bulk (NDJSON)", result['created'], time.perf_counter() - started)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+In-memory fallback store benchmark
+Loads 100k users and 1M goals into MemoryDatabase and times the operations the
+routes perform, next to the list-of-dicts scan the store replaced
+
+Usage: python benchmarks/bench_memory_store.py [--users N] [--goals-per-user N]
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import create_indexes, get_user_with_goals
+from storage.memory import MemoryDatabase
+
+def timed(label, fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = (time.perf_counter() - started) / repeat
+    print(f"{label:<40} {elapsed * 1e6:>12.1f} us/op")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=100_000)
+    parser.add_argument('--goals-per-user', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=1000)
+    args = parser.parse_args()
+    
+    db = MemoryDatabase()
+    create_indexes(db)
+    now = datetime.utcnow()
+    user_ids = [f"user-{i:07d}" for i in range(args.users)]
+    
+    started = time.perf_counter()
+    db.users.insert_many({
+        "user_id": user_id, "age_bracket": "19-22", "status": "student",
+        "monthly_income_range": "15k-30k", "created_at": now, "updated_at": now
+    } for user_id in user_ids)
+    db.goals.insert_many({
+        "goal_id": f"{user_id}-goal-{n}", "user_id": user_id, "dream": "Bike",
+        "target_amount": 100000, "current_amount": 5000, "timeline_months": 24, "created_at": now
+    } for user_id in user_ids for n in range(args.goals_per_user))
+    print(f"loaded {db.users.count_documents({})} users / {db.goals.count_documents({})} goals "
+          f"in {time.perf_counter() - started:.1f}s")
+    
+    pick = lambda: random.choice(user_ids)
+    timed("users.find_one(user_id)", lambda: db.users.find_one({"user_id": pick()}), args.repeat)
+    timed("goals.find(user_id)", lambda: list(db.goals.find({"user_id": pick()})), args.repeat)
+    timed("get_user_with_goals", lambda: get_user_with_goals(pick(), db), args.repeat)
+    timed("users.update_one($set)", lambda: db.users.update_one(
+        {"user_id": pick()}, {"$set": {"status": "professional"}}), args.repeat)
+    
+    victims = random.sample(user_ids, args.repeat)
+    def delete_user():
+        user_id = victims.pop()
+        db.users.delete_one({"user_id": user_id})
+        db.goals.delete_many({"user_id": user_id})
+    timed("delete user + goals", delete_user, args.repeat)
+    
+    # The list-of-dicts fallback this store replaced, for comparison
+    goals_list = list(db.goals.find({}))
+    scan_repeat = max(1, args.repeat // 100)
+    def scan_goals():
+        user_id = pick()
+        return [g for g in goals_list if g['user_id'] == user_id]
+    timed("list scan for one user's goals (old)", scan_goals, scan_repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo forecast benchmark
+Times the vectorized path simulation against the configured latency budget
+
+Usage: python benchmarks/bench_monte_carlo.py [--paths N] [--months N]
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from routes.analytics import simulate_savings_paths, path_percentiles, generate_forecast_data
+
+USER = {"user_id": "bench-user", "monthly_income_range": "15k-30k"}
+GOALS = [{"current_amount": 25000, "target_amount": 100000, "timeline_months": 24}]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--paths', type=int, default=2000)
+    parser.add_argument('--months', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+    
+    def simulate():
+        values = simulate_savings_paths(25000, 5000, args.months, 1 / 12, args.paths, np.random.default_rng(42))
+        path_percentiles(values, (5, 50, 95))
+    
+    seconds = min(timeit.repeat(simulate, number=args.repeat, repeat=3)) / args.repeat
+    print(f"simulation {args.paths} paths x {args.months} months: {seconds * 1e3:.2f} ms")
+    
+    for period in ['6months', '1year', '2years', '5years']:
+        seconds = min(timeit.repeat(
+            lambda: generate_forecast_data(USER, GOALS, period, 'savings_projection', mode='montecarlo', seed=42),
+            number=args.repeat, repeat=3
+        )) / args.repeat
+        print(f"forecast period={period:<8} mode=montecarlo: {seconds * 1e3:.2f} ms/request")
+
+if __name__ == "__main__":
+    main()
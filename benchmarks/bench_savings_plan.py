@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Savings plan milestone benchmark
+Compares the original create_savings_plan, which built one dict per month of
+the timeline, with the paged plan across timelines and milestone formats. For
+each case it reports the JSON response size and the time to build and
+serialize the plan.
+
+Usage: python benchmarks/bench_savings_plan.py [--iterations 2000]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from routes.goals import create_savings_plan
+
+def original_savings_plan(dream_cost, current_savings, timeline_months, monthly_income):
+    remaining_amount = dream_cost - current_savings
+    monthly_target = remaining_amount / timeline_months if timeline_months > 0 else 0
+    savings_rate = (monthly_target / monthly_income) * 100 if monthly_income > 0 else 0
+    milestones = []
+    for i in range(1, timeline_months + 1):
+        milestones.append({
+            "month": i,
+            "target_amount": current_savings + (monthly_target * i),
+            "monthly_saving": monthly_target
+        })
+    return {
+        "monthly_target": monthly_target,
+        "savings_rate_percentage": savings_rate,
+        "total_months": timeline_months,
+        "milestones": milestones,
+        "feasibility": "Easy" if savings_rate < 20 else "Challenging" if savings_rate < 40 else "Very Difficult"
+    }
+
+def measure(build, iterations):
+    size = len(json.dumps(build()))
+    started = time.perf_counter()
+    for _ in range(iterations):
+        json.dumps(build())
+    return size, (time.perf_counter() - started) / iterations * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    for months in (12, 120, 480):
+        plan = (5000000, 100000, months, 80000)
+        cases = (
+            ("original (all months)", lambda: original_savings_plan(*plan)),
+            ("objects, default page", lambda: create_savings_plan(*plan)),
+            ("objects, page_size=6", lambda: create_savings_plan(*plan, page_size=6)),
+            ("arrays, all months", lambda: create_savings_plan(*plan, page_size=months, milestone_format='arrays')),
+            ("yearly objects", lambda: create_savings_plan(*plan, granularity='yearly')),
+            ("schedule only", lambda: create_savings_plan(*plan, milestone_format='schedule')),
+        )
+        print(f"timeline_months={months}")
+        for label, build in cases:
+            size, micros = measure(build, args.iterations)
+            print(f"  {label:<26} {size:>8,} bytes  {micros:8.1f} us")
+
+if __name__ == "__main__":
+    main()
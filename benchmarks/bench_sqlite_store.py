@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+SQLite fallback store benchmark and crash-recovery check
+
+1. Throughput: single inserts, bulk inserts and indexed reads
+2. Concurrency: reader processes running while a writer process inserts
+3. Crash recovery: a child process commits some writes, then dies in the
+   middle of a transaction; the reopened store must hold exactly the
+   committed writes and pass PRAGMA integrity_check
+
+Usage: python benchmarks/bench_sqlite_store.py [--goals N] [--path FILE]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import create_indexes, get_user_with_goals
+from storage.sqlite import SQLiteDatabase, encode
+
+def goal(user_id, n):
+    return {
+        "goal_id": f"{user_id}-goal-{n}", "user_id": user_id, "dream": "Bike",
+        "target_amount": 100000, "current_amount": 5000, "timeline_months": 24,
+        "created_at": datetime.utcnow()
+    }
+
+def rate(label, count, seconds):
+    print(f"{label:<36} {count / seconds:>12,.0f} ops/s")
+
+def throughput(path, goals):
+    db = SQLiteDatabase(path)
+    create_indexes(db)
+    users = max(1, goals // 10)
+    user_ids = [f"user-{i:07d}" for i in range(users)]
+    
+    started = time.perf_counter()
+    for user_id in user_ids[:1000]:
+        db.users.insert_one({"user_id": user_id, "status": "student", "monthly_income_range": "15k-30k"})
+    rate("users.insert_one", min(1000, users), time.perf_counter() - started)
+    
+    started = time.perf_counter()
+    db.users.insert_many({"user_id": user_id, "status": "student", "monthly_income_range": "15k-30k"}
+                         for user_id in user_ids[1000:])
+    rate("users.insert_many", max(1, users - 1000), time.perf_counter() - started)
+    
+    started = time.perf_counter()
+    db.goals.insert_many(goal(user_id, n) for user_id in user_ids for n in range(10))
+    rate("goals.insert_many", users * 10, time.perf_counter() - started)
+    
+    started = time.perf_counter()
+    for _ in range(2000):
+        db.users.find_one({"user_id": random.choice(user_ids)})
+    rate("users.find_one(user_id)", 2000, time.perf_counter() - started)
+    
+    started = time.perf_counter()
+    for _ in range(2000):
+        get_user_with_goals(random.choice(user_ids), db)
+    rate("get_user_with_goals", 2000, time.perf_counter() - started)
+    return user_ids
+
+def reader(path, user_ids, seconds, results):
+    db = SQLiteDatabase(path)
+    reads = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        list(db.goals.find({"user_id": random.choice(user_ids)}))
+        reads += 1
+    results.put(reads)
+
+def writer(path, seconds, results):
+    db = SQLiteDatabase(path)
+    writes = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        db.goals.insert_one(goal(f"writer-{os.getpid()}", writes))
+        writes += 1
+    results.put(writes)
+
+def concurrency(path, user_ids, readers=4, seconds=3.0):
+    results = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=reader, args=(path, user_ids, seconds, results)) for _ in range(readers)]
+    procs.append(multiprocessing.Process(target=writer, args=(path, seconds, results)))
+    for proc in procs:
+        proc.start()
+    counts = [results.get() for _ in procs]
+    for proc in procs:
+        proc.join()
+    print(f"{readers} reader processes + 1 writer: {sum(counts[:-1]) / seconds:,.0f} reads/s, "
+          f"{counts[-1] / seconds:,.0f} writes/s")
+
+def crash_midway(path, committed):
+    db = SQLiteDatabase(path)
+    create_indexes(db)
+    db.goals.insert_many(goal("crash-user", n) for n in range(committed))
+    
+    # Open a transaction, write into it and die without committing
+    connection = db.connection()
+    connection.execute("BEGIN IMMEDIATE")
+    connection.execute('INSERT INTO "goals" (doc) VALUES (?)', (encode(goal("crash-user", committed)),))
+    os._exit(1)
+
+def crash_recovery(path, committed=500):
+    proc = multiprocessing.Process(target=crash_midway, args=(path, committed))
+    proc.start()
+    proc.join()
+    
+    db = SQLiteDatabase(path)
+    recovered = db.goals.count_documents({"user_id": "crash-user"})
+    integrity = db.execute("PRAGMA integrity_check").fetchone()[0]
+    ok = recovered == committed and integrity == 'ok'
+    print(f"crash recovery: {recovered}/{committed} committed goals present, integrity={integrity} "
+          f"-> {'PASS' if ok else 'FAIL'}")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--goals', type=int, default=100_000)
+    parser.add_argument('--path', help="database file (default: a temporary file)")
+    args = parser.parse_args()
+    
+    workdir = tempfile.mkdtemp(prefix="finbuddy-bench-")
+    path = args.path or os.path.join(workdir, "bench.db")
+    
+    user_ids = throughput(path, args.goals)
+    concurrency(path, user_ids)
+    ok = crash_recovery(os.path.join(workdir, "crash.db"))
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
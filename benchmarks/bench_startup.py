@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+App factory startup benchmark
+Starts fresh interpreters that import app_factory and call create_app(), and
+reports wall time, cumulative import time (from `python -X importtime`) and
+peak RSS. Runs once as the app now starts, and once with langchain_openai
+imported up front the way every process used to. Finally it times the first
+chat request's get_llm(), which is where the LLM client now gets loaded.
+
+Usage: python benchmarks/bench_startup.py [--runs 3]
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CHILD = """
+import json, resource, time
+started = time.perf_counter()
+{preload}
+from app_factory import create_app
+app = create_app()
+startup = time.perf_counter() - started
+rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+first_chat = None
+if {chat}:
+    import routes.chat
+    started = time.perf_counter()
+    assert routes.chat.get_llm() is not None
+    first_chat = time.perf_counter() - started
+chat_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print("RESULT" + json.dumps({{"startup": startup, "rss_mb": rss_mb, "first_chat": first_chat, "chat_rss_mb": chat_rss_mb}}))
+"""
+
+IMPORT_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| (.*)$")
+
+def run_child(preload, chat=False, api_key="sk-benchmark-not-a-real-key"):
+    env = dict(os.environ, PYTHONPATH=str(ROOT), OPENAI_API_KEY=api_key,
+               MONGO_SERVER_SELECTION_TIMEOUT_MS='100', FALLBACK_STORE='memory')
+    code = CHILD.format(preload=preload, chat=chat)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    stats = json.loads(result.stdout.split("RESULT", 1)[1])
+
+    # Top-level packages only (no leading spaces) give the cumulative import time per package
+    packages = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match and not match.group(2).startswith(" "):
+            packages[match.group(2)] = int(match.group(1))
+    stats["import_seconds"] = sum(packages.values()) / 1e6
+    stats["heaviest"] = sorted(packages.items(), key=lambda item: -item[1])[:5]
+    return stats
+
+def report(label, runs, preload, chat=False):
+    results = [run_child(preload, chat) for _ in range(runs)]
+    startup = statistics.median(r["startup"] for r in results)
+    imports = statistics.median(r["import_seconds"] for r in results)
+    rss = statistics.median(r["rss_mb"] for r in results)
+    print(f"{label:<34} startup {startup:6.2f}s   imports {imports:6.2f}s   peak RSS {rss:6.1f} MB")
+    heaviest = ", ".join(f"{name} {us / 1e6:.2f}s" for name, us in results[-1]["heaviest"])
+    print(f"{'':<34} heaviest imports: {heaviest}")
+    if chat:
+        first = statistics.median(r["first_chat"] for r in results)
+        chat_rss = statistics.median(r["chat_rss_mb"] for r in results)
+        print(f"{'':<34} LLM client load on first chat: {first:6.2f}s, peak RSS after {chat_rss:6.1f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    print("(startup includes the MongoDB probe, capped at 100 ms here)\n")
+    report("lazy AI imports (current)", args.runs, "")
+    report("eager langchain_openai + openai", args.runs, "import openai, langchain_openai")
+    report("lazy, including first chat", args.runs, "", chat=True)
+
+if __name__ == "__main__":
+    main()
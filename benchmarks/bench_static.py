@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Static serving benchmark for the React build
+Builds a synthetic CRA-style build directory (index.html plus hashed JS/CSS
+bundles), then measures requests per second for the SPA shell, a client-side
+route and the main bundle. It compares the original send_from_directory
+handler with StaticAssets, with and without gzip accepted, and reports bytes
+on the wire. It uses Flask's test client, so the numbers exclude network and
+server overhead.
+
+Usage: python benchmarks/bench_static.py [--requests 5000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from flask import Flask, jsonify, request, send_from_directory
+from utils.static_files import StaticAssets
+
+def make_build(root):
+    rng = random.Random(3)
+    words = ["const", "function", "return", "useState", "props", "className", "div", "span", "=>", "{", "}"]
+    bundle = " ".join(rng.choice(words) for _ in range(60000)).encode()
+    files = {
+        "index.html": b'<!doctype html><html lang="en"><head><meta charset="utf-8"/><title>FinBuddy</title>'
+                      b'<script defer src="/static/js/main.3f9a1c2e.js"></script>'
+                      b'<link href="/static/css/main.8b7d6e5f.css" rel="stylesheet"></head>'
+                      b'<body><div id="root"></div></body></html>' + b" " * 1500,
+        "static/js/main.3f9a1c2e.js": bundle,
+        "static/css/main.8b7d6e5f.css": b".card{padding:8px;margin:4px}" * 800,
+        "manifest.json": b'{"short_name":"FinBuddy","name":"FinBuddy"}',
+    }
+    for name, body in files.items():
+        path = os.path.join(root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(body)
+
+def original_app(root):
+    app = Flask(__name__, static_folder=root, static_url_path='')
+
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve_react_app(path):
+        try:
+            if path != "" and os.path.exists(app.static_folder + '/' + path):
+                return send_from_directory(app.static_folder, path)
+            else:
+                return send_from_directory(app.static_folder, 'index.html')
+        except:
+            return jsonify({"message": "FinBuddy API is running!"})
+    return app
+
+def indexed_app(root):
+    app = Flask(__name__, static_folder=None)
+    assets = StaticAssets(root)
+
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve_react_app(path):
+        return assets.response(assets.lookup(path), request)
+    return app
+
+def measure(label, app, path, requests, headers=None):
+    client = app.test_client()
+    response = client.get(path, headers=headers or {})
+    size = len(response.get_data())
+    started = time.perf_counter()
+    for _ in range(requests):
+        client.get(path, headers=headers or {}).close()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<44} {requests / elapsed:9,.0f} req/s  {size:>8,} bytes  "
+          f"{response.headers.get('Content-Encoding', 'identity'):<8} {response.headers.get('Cache-Control', '-')}")
+    return response
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        make_build(root)
+        original, indexed = original_app(root), indexed_app(root)
+        gzip_headers = {'Accept-Encoding': 'gzip, deflate, br'}
+
+        for label, path in (("SPA shell /", "/"), ("client route /dashboard", "/dashboard"),
+                            ("bundle /static/js/main.*.js", "/static/js/main.3f9a1c2e.js")):
+            measure(f"original    {label}", original, path, args.requests)
+            measure(f"indexed     {label}", indexed, path, args.requests)
+            response = measure(f"indexed+gz  {label}", indexed, path, args.requests, gzip_headers)
+            etag = response.headers['ETag']
+            revalidated = indexed.test_client().get(path, headers={**gzip_headers, 'If-None-Match': etag})
+            print(f"{'':<44} revalidation with ETag -> {revalidated.status_code}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Time-series analytics benchmark
+Measures the per-request cost of generate_time_series_data for every period and chart type
+
+Usage: python benchmarks/bench_time_series.py [--repeat N]
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from routes.analytics import generate_time_series_data, TIME_SERIES_PERIODS
+
+USER = {"user_id": "bench-user", "monthly_income_range": "30k-50k", "age_bracket": "19-22", "status": "student"}
+CHART_TYPES = ['savings', 'expenses', 'investments']
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=2000, help="calls per period/type combination")
+    args = parser.parse_args()
+    
+    print(f"{'period':<10} {'type':<12} {'points':>6} {'us/request':>11}")
+    for period in TIME_SERIES_PERIODS:
+        for chart_type in CHART_TYPES:
+            points = len(generate_time_series_data(USER, [], period, chart_type)['labels'])
+            seconds = min(timeit.repeat(
+                lambda: generate_time_series_data(USER, [], period, chart_type),
+                number=args.repeat, repeat=3
+            ))
+            print(f"{period:<10} {chart_type:<12} {points:>6} {seconds / args.repeat * 1e6:>11.1f}")
+
+if __name__ == "__main__":
+    main()
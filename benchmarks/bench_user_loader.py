@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+User + goals loader benchmark
+Compares the old two-query fetch (goals.find then users.find_one) with the
+single $lookup aggregation used by the analytics routes. Needs a running
+mongod; data is written to a throwaway 'finbuddy_bench' database.
+
+Usage: MONGODB_URI=mongodb://localhost:27017/ python benchmarks/bench_user_loader.py
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from pymongo import MongoClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import get_user_with_goals
+
+def seed(database, users, goals_per_user):
+    database.users.drop()
+    database.goals.drop()
+    database.users.create_index("user_id", unique=True)
+    database.goals.create_index("user_id")
+    
+    user_ids = [str(uuid.uuid4()) for _ in range(users)]
+    database.users.insert_many([{
+        "user_id": user_id, "age_bracket": "19-22", "status": "student",
+        "monthly_income_range": "15k-30k", "name": f"User_{user_id[:8]}",
+        "created_at": datetime.utcnow(), "updated_at": datetime.utcnow()
+    } for user_id in user_ids])
+    database.goals.insert_many([{
+        "goal_id": str(uuid.uuid4()), "user_id": user_id, "dream": "Bike",
+        "target_amount": 100000, "current_amount": random.randint(0, 50000),
+        "timeline_months": 24, "created_at": datetime.utcnow()
+    } for user_id in user_ids for _ in range(goals_per_user)])
+    return user_ids
+
+def two_queries(database, user_id):
+    goals = list(database.goals.find({"user_id": user_id}))
+    user = database.users.find_one({"user_id": user_id})
+    return user, goals
+
+def measure(label, fetch, user_ids):
+    timings = []
+    for user_id in user_ids:
+        started = time.perf_counter()
+        fetch(user_id)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    p50 = timings[len(timings) // 2] * 1e3
+    p95 = timings[int(len(timings) * 0.95)] * 1e3
+    print(f"{label:<22} p50={p50:.3f} ms  p95={p95:.3f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--goals-per-user', type=int, default=5)
+    parser.add_argument('--samples', type=int, default=2000)
+    args = parser.parse_args()
+    
+    client = MongoClient(os.getenv('MONGODB_URI', 'mongodb://localhost:27017/'))
+    database = client['finbuddy_bench']
+    user_ids = seed(database, args.users, args.goals_per_user)
+    sample = random.sample(user_ids, min(args.samples, len(user_ids)))
+    
+    measure("find + find_one", lambda user_id: two_queries(database, user_id), sample)
+    measure("$lookup aggregation", lambda user_id: get_user_with_goals(user_id, database), sample)
+    
+    client.drop_database('finbuddy_bench')
+
+if __name__ == "__main__":
+    main()
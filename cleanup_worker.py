@@ -0,0 +1,177 @@
+"""Background removal of a deleted user's goals, contributions and learning progress
+
+DELETE /api/user/<user_id> removes the profile at once and leaves a tombstone
+in `deleted_users`. This worker then deletes the related documents in batches,
+recording after every batch what is left and how much has gone, so a worker
+that stops part way (restart, crash) is picked up again from the tombstone.
+"""
+
+import os
+import queue
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from config import Config
+from database import get_db
+from storage.base import LocalDatabase
+from utils.cache import invalidate_user_analytics
+
+CLEANUP_COLLECTIONS = ('goals', 'contributions', 'learning_progress')
+
+def new_tombstone(user_id):
+    now = datetime.utcnow()
+    tombstone = {
+        "user_id": user_id,
+        "status": "pending",
+        "remaining": list(CLEANUP_COLLECTIONS),
+        "deleted_at": now,
+        "heartbeat_at": now,
+        "finished_at": None
+    }
+    tombstone.update({f"deleted_{name}": 0 for name in CLEANUP_COLLECTIONS})
+    return tombstone
+
+def tombstone_progress(tombstone):
+    return {
+        "user_id": tombstone['user_id'],
+        "status": tombstone['status'],
+        "remaining": tombstone['remaining'],
+        "deleted": {name: tombstone.get(f"deleted_{name}", 0) for name in CLEANUP_COLLECTIONS},
+        "deleted_at": tombstone['deleted_at'].isoformat(),
+        "finished_at": tombstone['finished_at'].isoformat() if tombstone.get('finished_at') else None
+    }
+
+def delete_batch(db, collection, user_id, batch_size):
+    """Delete up to `batch_size` of the user's documents; returns how many went
+
+    MongoDB deletes one batch of _ids at a time so no single operation runs
+    long. The local stores have no _id; their indexed delete_many removes the
+    rest in one pass under the store's lock or transaction.
+    """
+    if isinstance(db, LocalDatabase):
+        return collection.delete_many({"user_id": user_id}).deleted_count
+    ids = [doc['_id'] for doc in collection.find({"user_id": user_id}, {"_id": 1}).limit(batch_size)]
+    if not ids:
+        return 0
+    return collection.delete_many({"_id": {"$in": ids}}).deleted_count
+
+class CleanupWorker:
+    """One daemon thread per process working through queued tombstones
+
+    A tombstone is claimed with a conditional update, so with several worker
+    processes each user is cleaned by one of them. A claim whose heartbeat is
+    older than `lease_seconds` is taken over, which is how work abandoned by a
+    dead process or a failed attempt resumes: every `lease_seconds` the thread
+    sweeps deleted_users for pending and stale tombstones and queues them again.
+    """
+
+    def __init__(self, batch_size=1000, lease_seconds=60):
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.completed = 0
+        self.documents_deleted = 0
+        self._queue = queue.Queue()
+        self._waiting = set()  # tombstones another worker held a live lease on
+        self._next_sweep = 0.0
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_running(self):
+        """Start the thread in this process (again after a fork) and requeue unfinished tombstones"""
+        with self._lock:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._queue = queue.Queue()
+            self._waiting = set()
+            self._next_sweep = time.monotonic() + self.lease_seconds
+            self._thread = threading.Thread(target=self._run, name="finbuddy-cleanup", daemon=True)
+            self._thread.start()
+        # Including tombstones still leased by a worker that just died; they wait for the lease
+        for tombstone in get_db().deleted_users.find({"status": {"$ne": "done"}}, {"user_id": 1}):
+            self._queue.put(tombstone['user_id'])
+
+    def enqueue(self, user_id):
+        self.ensure_running()
+        self._queue.put(user_id)
+
+    def _run(self):
+        while True:
+            try:
+                user_id = self._queue.get(timeout=self.lease_seconds)
+            except queue.Empty:
+                user_id = None
+            if user_id is not None:
+                try:
+                    if not self.process(user_id):
+                        self._waiting.add(user_id)
+                except Exception as e:
+                    # The tombstone stays unfinished; a sweep queues it again once its lease expires
+                    print(f"Cleanup of user {user_id} failed: {e}")
+            if time.monotonic() >= self._next_sweep:
+                try:
+                    self.sweep()
+                except Exception as e:
+                    print(f"Cleanup sweep failed: {e}")
+                self._next_sweep = time.monotonic() + self.lease_seconds
+
+    def sweep(self):
+        """Queue tombstones nobody is working on: pending, or running with an expired lease"""
+        db = get_db()
+        stale = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+        user_ids = {tombstone['user_id'] for tombstone in db.deleted_users.find({"status": "pending"}, {"user_id": 1})}
+        user_ids.update(tombstone['user_id'] for tombstone in db.deleted_users.find(
+            {"status": "running", "heartbeat_at": {"$lt": stale}}, {"user_id": 1}))
+        user_ids.update(self._waiting)
+        self._waiting = set()
+        for user_id in user_ids:
+            self._queue.put(user_id)
+        return len(user_ids)
+
+    def claim(self, db, user_id):
+        now = datetime.utcnow()
+        claimed = {"$set": {"status": "running", "owner": f"{socket.gethostname()}:{os.getpid()}", "heartbeat_at": now}}
+        if db.deleted_users.update_one({"user_id": user_id, "status": "pending"}, claimed).matched_count:
+            return True
+        stale = now - timedelta(seconds=self.lease_seconds)
+        return bool(db.deleted_users.update_one(
+            {"user_id": user_id, "status": "running", "heartbeat_at": {"$lt": stale}}, claimed
+        ).matched_count)
+
+    def process(self, user_id):
+        """Delete everything left for one tombstone; returns False while another worker's lease on it is live"""
+        db = get_db()
+        if not self.claim(db, user_id):
+            # Either finished already, or leased by another worker that may still die
+            return db.deleted_users.find_one({"user_id": user_id, "status": "running"}, {"user_id": 1}) is None
+        # The profile normally went in the request; this finishes a delete interrupted after the tombstone
+        db.users.delete_one({"user_id": user_id})
+        tombstone = db.deleted_users.find_one({"user_id": user_id})
+        remaining = list(tombstone['remaining'])
+        while remaining:
+            name = remaining[0]
+            deleted = delete_batch(db, db[name], user_id, self.batch_size)
+            if deleted == 0:
+                remaining.pop(0)
+            db.deleted_users.update_one({"user_id": user_id}, {
+                "$inc": {f"deleted_{name}": deleted},
+                "$set": {"remaining": remaining, "heartbeat_at": datetime.utcnow()}
+            })
+            self.documents_deleted += deleted
+        db.deleted_users.update_one({"user_id": user_id}, {"$set": {"status": "done", "finished_at": datetime.utcnow()}})
+        invalidate_user_analytics(user_id)
+        self.completed += 1
+        return True
+
+    def stats(self):
+        return {
+            "running": self._thread is not None and self._pid == os.getpid() and self._thread.is_alive(),
+            "queued": self._queue.qsize(),
+            "waiting": len(self._waiting),
+            "completed": self.completed,
+            "documents_deleted": self.documents_deleted
+        }
+
+cleanup_worker = CleanupWorker(batch_size=Config.CLEANUP_BATCH_SIZE, lease_seconds=Config.CLEANUP_LEASE_SECONDS)
@@ -0,0 +1,167 @@
+"""Peer cohort statistics behind compare_with_peers
+
+Users are grouped by (age_bracket, status, monthly_income_range). Per cohort
+the table holds the user count, mean and percentile savings, mean goal count
+and goal completion rate. It is rebuilt periodically off the request path, so
+a peer lookup is a dict access.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from config import Config
+from database import get_db
+from storage.base import LocalDatabase
+
+COHORT_FIELDS = ('age_bracket', 'status', 'monthly_income_range')
+PERCENTILES = (10, 25, 50, 75, 90)
+
+# Saved amount, goal count and completed goals per user, summed by MongoDB
+GOALS_PER_USER_PIPELINE = [
+    {"$group": {
+        "_id": "$user_id",
+        "saved": {"$sum": "$current_amount"},
+        "goals": {"$sum": 1},
+        "completed": {"$sum": {"$cond": [
+            {"$and": [{"$gt": ["$target_amount", 0]}, {"$gte": ["$current_amount", "$target_amount"]}]}, 1, 0
+        ]}}
+    }}
+]
+
+def cohort_key(user):
+    return tuple(user.get(field) for field in COHORT_FIELDS)
+
+def goals_per_user(db, user_index):
+    """(saved, goal count, completed goals) arrays aligned with `user_index`
+
+    Goals of users that no longer exist are skipped.
+    """
+    n = len(user_index)
+    if not isinstance(db, LocalDatabase):
+        saved, goals, completed = np.zeros(n), np.zeros(n), np.zeros(n)
+        for row in db.goals.aggregate(GOALS_PER_USER_PIPELINE):
+            i = user_index.get(row['_id'])
+            if i is not None:
+                saved[i], goals[i], completed[i] = row['saved'], row['goals'], row['completed']
+        return saved, goals, completed
+
+    owners, amounts, done = [], [], []
+    for goal in db.goals.find({}, {"user_id": 1, "current_amount": 1, "target_amount": 1}):
+        i = user_index.get(goal.get('user_id'))
+        if i is None:
+            continue
+        current, target = goal.get('current_amount') or 0, goal.get('target_amount') or 0
+        owners.append(i)
+        amounts.append(current)
+        done.append(target > 0 and current >= target)
+    owners = np.asarray(owners, dtype=np.int64)
+    return (np.bincount(owners, weights=np.asarray(amounts, dtype=float), minlength=n),
+            np.bincount(owners, minlength=n).astype(float),
+            np.bincount(owners, weights=np.asarray(done, dtype=float), minlength=n))
+
+def build_cohort_table(db):
+    """Cohort key -> statistics, from one pass over users and goals"""
+    users = list(db.users.find({}, {"_id": 0, "user_id": 1, **{field: 1 for field in COHORT_FIELDS}}))
+    if not users:
+        return {}
+    saved, goals, completed = goals_per_user(db, {user['user_id']: i for i, user in enumerate(users)})
+
+    keys = {}
+    codes = np.array([keys.setdefault(cohort_key(user), len(keys)) for user in users])
+    order = np.argsort(codes, kind='stable')
+    table = {}
+    for members in np.split(order, np.flatnonzero(np.diff(codes[order])) + 1):
+        cohort_saved, cohort_goals = saved[members], goals[members].sum()
+        table[cohort_key(users[members[0]])] = {
+            "users": int(len(members)),
+            "mean_savings": float(cohort_saved.mean()),
+            "percentiles": dict(zip(PERCENTILES, np.percentile(cohort_saved, PERCENTILES).tolist())),
+            "mean_goals": float(goals[members].mean()),
+            "completion_rate": float(completed[members].sum() / cohort_goals) if cohort_goals else 0.0
+        }
+    return table
+
+def table_to_documents(table, refreshed_at):
+    return [{
+        **dict(zip(COHORT_FIELDS, key)),
+        **stats,
+        "percentiles": {f"p{p}": value for p, value in stats['percentiles'].items()},
+        "refreshed_at": refreshed_at
+    } for key, stats in table.items()]
+
+def table_from_documents(documents):
+    return {cohort_key(doc): {
+        "users": doc['users'],
+        "mean_savings": doc['mean_savings'],
+        "percentiles": {p: doc['percentiles'][f"p{p}"] for p in PERCENTILES},
+        "mean_goals": doc['mean_goals'],
+        "completion_rate": doc['completion_rate']
+    } for doc in documents}
+
+class CohortStats:
+    """In-process copy of the cohort_stats collection, refreshed in the background
+
+    A lookup on a stale table starts one refresh thread and keeps answering
+    from the old table meanwhile. A refresh reuses the stored table when another
+    process rebuilt it within `refresh_seconds`, and otherwise rebuilds and
+    stores it.
+    """
+
+    def __init__(self, refresh_seconds=3600, min_size=5):
+        self.refresh_seconds = refresh_seconds
+        self.min_size = min_size
+        self.refreshed_at = None
+        self.build_seconds = 0.0
+        self._table = {}
+        self._expires = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def lookup(self, user):
+        """Statistics of the user's cohort, or None until it has `min_size` members"""
+        if time.monotonic() >= self._expires:
+            self._refresh_in_background()
+        stats = self._table.get(cohort_key(user))
+        return stats if stats is not None and stats['users'] >= self.min_size else None
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self.refresh, name="finbuddy-cohorts", daemon=True).start()
+
+    def refresh(self):
+        try:
+            db = get_db()
+            now = datetime.utcnow()
+            stored = list(db.cohort_stats.find({"refreshed_at": {"$gt": now - timedelta(seconds=self.refresh_seconds)}}))
+            if stored:
+                table, refreshed_at = table_from_documents(stored), stored[0]['refreshed_at']
+            else:
+                started = time.perf_counter()
+                table, refreshed_at = build_cohort_table(db), now
+                self.build_seconds = time.perf_counter() - started
+                db.cohort_stats.delete_many({})
+                if table:
+                    db.cohort_stats.insert_many(table_to_documents(table, refreshed_at))
+            self._table, self.refreshed_at = table, refreshed_at
+            self._expires = time.monotonic() + self.refresh_seconds - (now - refreshed_at).total_seconds()
+        except Exception as e:
+            # Keep serving the old table and try again in a minute
+            print(f"Cohort statistics refresh failed: {e}")
+            self._expires = time.monotonic() + min(60, self.refresh_seconds)
+        finally:
+            self._refreshing = False
+
+    def stats(self):
+        return {
+            "cohorts": len(self._table),
+            "refreshed_at": self.refreshed_at.isoformat() if self.refreshed_at else None,
+            "build_seconds": round(self.build_seconds, 3),
+            "refresh_seconds": self.refresh_seconds,
+            "min_size": self.min_size
+        }
+
+cohort_stats = CohortStats(refresh_seconds=Config.COHORT_REFRESH_SECONDS, min_size=Config.COHORT_MIN_SIZE)
@@ -7,10 +7,86 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'finbuddy-secret-key')
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
     MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
+    
+    # MongoClient connection pool and timeouts
+    MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', 100))
+    MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', 0))
+    MONGO_MAX_IDLE_TIME_MS = int(os.getenv('MONGO_MAX_IDLE_TIME_MS', 60000))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', 2000))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 3000))
+    MONGO_CONNECT_TIMEOUT_MS = int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', 3000))
+    MONGO_SOCKET_TIMEOUT_MS = int(os.getenv('MONGO_SOCKET_TIMEOUT_MS', 10000))
+    MONGO_COMPRESSORS = os.getenv('MONGO_COMPRESSORS', '')  # e.g. 'zstd,snappy' (needs zstandard / python-snappy)
     PORT = int(os.getenv('PORT', 5000))
     FLASK_ENV = os.getenv('FLASK_ENV', 'production')
     DEBUG = FLASK_ENV == 'development'
     
+    # Local storage used when MongoDB is unreachable: 'memory' or 'sqlite' (durable, multi-process)
+    FALLBACK_STORE = os.getenv('FALLBACK_STORE', 'memory')
+    FALLBACK_SQLITE_PATH = os.getenv('FALLBACK_SQLITE_PATH', 'finbuddy_local.db')
+    
+    # Monte Carlo forecast configuration (paths x forecast points is capped by MAX_CELLS;
+    # 60k cells is about 3.5 ms per forecast, see benchmarks/bench_monte_carlo.py)
+    MONTE_CARLO_PATHS = int(os.getenv('MONTE_CARLO_PATHS', 2000))
+    MONTE_CARLO_MAX_CELLS = int(os.getenv('MONTE_CARLO_MAX_CELLS', 60000))
+    
+    # Analytics response cache (entries per process, seconds before expiry)
+    ANALYTICS_CACHE_SIZE = int(os.getenv('ANALYTICS_CACHE_SIZE', 1024))
+    ANALYTICS_CACHE_TTL = int(os.getenv('ANALYTICS_CACHE_TTL', 60))
+    
+    # GET /api/users keyset pagination
+    USERS_PAGE_SIZE = int(os.getenv('USERS_PAGE_SIZE', 100))
+    USERS_PAGE_MAX = int(os.getenv('USERS_PAGE_MAX', 1000))
+    
+    # POST /api/goals/bulk: documents per insert_many batch, rows per request, longest goal
+    GOALS_BULK_BATCH_SIZE = int(os.getenv('GOALS_BULK_BATCH_SIZE', 1000))
+    GOALS_BULK_MAX_ROWS = int(os.getenv('GOALS_BULK_MAX_ROWS', 50000))
+    GOAL_MAX_TIMELINE_MONTHS = int(os.getenv('GOAL_MAX_TIMELINE_MONTHS', 600))
+    # GET /api/goals/<user_id>/<goal_id>/contributions page size
+    CONTRIBUTIONS_PAGE_SIZE = int(os.getenv('CONTRIBUTIONS_PAGE_SIZE', 100))
+    CONTRIBUTIONS_PAGE_MAX = int(os.getenv('CONTRIBUTIONS_PAGE_MAX', 1000))
+    # Savings plan milestones returned per page by default, and the largest page allowed
+    MILESTONES_PAGE_SIZE = int(os.getenv('MILESTONES_PAGE_SIZE', 120))
+    MILESTONES_PAGE_MAX = int(os.getenv('MILESTONES_PAGE_MAX', 600))
+    
+    # Background cleanup after DELETE /api/user: documents per delete batch, and seconds
+    # without progress after which another worker takes over an unfinished cleanup
+    CLEANUP_BATCH_SIZE = int(os.getenv('CLEANUP_BATCH_SIZE', 1000))
+    CLEANUP_LEASE_SECONDS = int(os.getenv('CLEANUP_LEASE_SECONDS', 60))
+    
+    # Peer cohort statistics: seconds between rebuilds, and the smallest cohort compared against
+    COHORT_REFRESH_SECONDS = int(os.getenv('COHORT_REFRESH_SECONDS', 3600))
+    COHORT_MIN_SIZE = int(os.getenv('COHORT_MIN_SIZE', 5))
+    
+    # Per-session chat memory: turns kept, live sessions, idle expiry and total stored characters
+    CHAT_MEMORY_TURNS = int(os.getenv('CHAT_MEMORY_TURNS', 4))
+    CHAT_MAX_SESSIONS = int(os.getenv('CHAT_MAX_SESSIONS', 1000))
+    CHAT_SESSION_IDLE_SECONDS = int(os.getenv('CHAT_SESSION_IDLE_SECONDS', 1800))
+    CHAT_MEMORY_MAX_CHARS = int(os.getenv('CHAT_MEMORY_MAX_CHARS', 2000000))
+    
+    # Chat response cache for first-turn questions; CHAT_CACHE_SIMILARITY > 0 also
+    # reuses answers to similar questions (cosine similarity of local hashed embeddings)
+    CHAT_CACHE_SIZE = int(os.getenv('CHAT_CACHE_SIZE', 2048))
+    CHAT_CACHE_TTL = int(os.getenv('CHAT_CACHE_TTL', 3600))
+    CHAT_CACHE_SIMILARITY = float(os.getenv('CHAT_CACHE_SIMILARITY', 0))
+    
+    # Upstream LLM calls running at once, and seconds a request may queue for one
+    # before it is answered with a fallback response instead
+    LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', 8))
+    LLM_QUEUE_TIMEOUT = float(os.getenv('LLM_QUEUE_TIMEOUT', 10))
+    
+    # Production server (python run.py with FLASK_ENV=production): gunicorn pre-fork
+    # workers x threads each, or waitress threads where gunicorn is unavailable (Windows)
+    WEB_SERVER = os.getenv('WEB_SERVER', 'auto')
+    WEB_WORKERS = int(os.getenv('WEB_WORKERS', (os.cpu_count() or 1) * 2 + 1))
+    WEB_THREADS = int(os.getenv('WEB_THREADS', 4))
+    WEB_TIMEOUT = int(os.getenv('WEB_TIMEOUT', 120))
+    WEB_GRACEFUL_TIMEOUT = int(os.getenv('WEB_GRACEFUL_TIMEOUT', 30))
+    WEB_MAX_REQUESTS = int(os.getenv('WEB_MAX_REQUESTS', 0))
+    
     # Static folder configuration
     STATIC_FOLDER = 'frontend/build'
-    STATIC_URL_PATH = ''
\ No newline at end of file
+    STATIC_URL_PATH = ''
+    # Build files up to this size are kept in memory with gzip/brotli variants
+    STATIC_INLINE_MAX = int(os.getenv('STATIC_INLINE_MAX', 2 * 1024 * 1024))
+    STATIC_PRECOMPRESS = os.getenv('STATIC_PRECOMPRESS', 'true').lower() == 'true'
\ No newline at end of file
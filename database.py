@@ -1,14 +1,146 @@
-from pymongo import MongoClient
+import asyncio
+import threading
+import time
+from pymongo import AsyncMongoClient, MongoClient, monitoring
 from config import Config
+from storage.base import LocalDatabase
+from storage.memory import MemoryDatabase
+from storage.sqlite import SQLiteDatabase
+from utils.metrics import mongo_command_duration
 
 client = None
 db = None
+async_client = None
+async_db = None
+
+# Fields the analytics generators read; everything else stays on the server
+# Running goal totals kept on the user document with $inc, see routes/goals.py
+GOAL_TOTAL_FIELDS = ('goals_count', 'goals_target_total', 'goals_current_total')
+USER_ANALYTICS_FIELDS = ('user_id', 'age_bracket', 'status', 'monthly_income_range') + GOAL_TOTAL_FIELDS
+GOAL_ANALYTICS_FIELDS = ('dream', 'target_amount', 'current_amount', 'timeline_months')
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Connection pool counters fed by pymongo's CMAP events"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.pools = 0
+            self.pool_clears = 0
+            self.connections_open = 0
+            self.connections_created = 0
+            self.connections_closed = 0
+            self.checkouts_started = 0
+            self.checkouts = 0
+            self.checkout_failures = 0
+            self.checkins = 0
+            self.total_wait_ms = 0.0
+            self.max_wait_ms = 0.0
+
+    def _count(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def pool_created(self, event):
+        self._count(pools=1)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._count(pool_clears=1)
+
+    def pool_closed(self, event):
+        self._count(pools=-1)
+
+    def connection_created(self, event):
+        self._count(connections_created=1, connections_open=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._count(connections_closed=1, connections_open=-1)
+
+    def connection_check_out_started(self, event):
+        # Check-out events fire on the requesting thread, so a thread-local start time is enough
+        self._local.started = time.perf_counter()
+        self._count(checkouts_started=1)
+
+    def connection_check_out_failed(self, event):
+        self._local.started = None
+        self._count(checkout_failures=1)
+
+    def connection_checked_out(self, event):
+        started = getattr(self._local, 'started', None)
+        waited_ms = (time.perf_counter() - started) * 1000 if started else 0.0
+        self._local.started = None
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_ms += waited_ms
+            self.max_wait_ms = max(self.max_wait_ms, waited_ms)
+
+    def connection_checked_in(self, event):
+        self._count(checkins=1)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pools": self.pools,
+                "pool_clears": self.pool_clears,
+                "connections_open": self.connections_open,
+                "connections_created": self.connections_created,
+                "connections_closed": self.connections_closed,
+                "connections_in_use": self.checkouts - self.checkins,
+                "checkouts": self.checkouts,
+                "checkouts_waiting": self.checkouts_started - self.checkouts - self.checkout_failures,
+                "checkout_failures": self.checkout_failures,
+                "avg_checkout_wait_ms": round(self.total_wait_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "max_checkout_wait_ms": round(self.max_wait_ms, 3)
+            }
+
+pool_stats = PoolStatsListener()
+
+class CommandTimingListener(monitoring.CommandListener):
+    """Feeds MongoDB command latencies (measured by the driver) into /api/metrics"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        mongo_command_duration.observe(event.duration_micros / 1e6, event.command_name, 'ok')
+
+    def failed(self, event):
+        mongo_command_duration.observe(event.duration_micros / 1e6, event.command_name, 'error')
+
+command_timings = CommandTimingListener()
+
+def mongo_client_options():
+    """MongoClient keyword arguments built from Config"""
+    options = {
+        "maxPoolSize": Config.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": Config.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": Config.MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": Config.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": Config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": Config.MONGO_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": Config.MONGO_SOCKET_TIMEOUT_MS
+    }
+    compressors = [c.strip() for c in Config.MONGO_COMPRESSORS.split(',') if c.strip()]
+    if compressors:
+        options["compressors"] = compressors
+    return options
 
 def init_db():
     global client, db
     try:
         mongodb_uri = Config.MONGODB_URI
-        client = MongoClient(mongodb_uri)
+        client = MongoClient(mongodb_uri, event_listeners=[pool_stats, command_timings], **mongo_client_options())
         db = client['finbuddy']
         
         # Test connection
@@ -16,19 +148,129 @@ def init_db():
         print("Connected to MongoDB successfully!")
         
         # Create indexes for better performance
-        db.users.create_index("user_id", unique=True)
-        db.goals.create_index("user_id")
-        db.learning_progress.create_index("user_id")
+        create_indexes(db)
         
     except Exception as e:
         print(f"MongoDB connection failed: {e}")
         print("Using local fallback - consider setting up MongoDB Atlas")
-        # Fallback to in-memory storage for development
-        db = {
-            'users': [],
-            'goals': [],
-            'learning_progress': []
-        }
+        db = create_fallback_db()
+        create_indexes(db)
+
+def close_db():
+    """Close the MongoDB client so a forked worker can open its own with init_db()"""
+    global client, db
+    if client is not None:
+        client.close()
+    client, db = None, None
+
+def create_fallback_db():
+    """Local store selected by Config.FALLBACK_STORE"""
+    if Config.FALLBACK_STORE == 'sqlite':
+        print(f"Fallback storage: SQLite (WAL) at {Config.FALLBACK_SQLITE_PATH}")
+        return SQLiteDatabase(Config.FALLBACK_SQLITE_PATH)
+    # Indexed in-memory storage for development
+    return MemoryDatabase()
+
+def create_indexes(database):
+    """Create the indexes every backend relies on for user/goal lookups"""
+    database.users.create_index("user_id", unique=True)
+    database.goals.create_index("goal_id", unique=True)
+    database.goals.create_index("user_id")
+    database.learning_progress.create_index("user_id")
+    database.contributions.create_index("entry_id", unique=True)
+    database.contributions.create_index("goal_id")
+    database.contributions.create_index("user_id")
+    database.deleted_users.create_index("user_id", unique=True)
+    database.deleted_users.create_index("status")
 
 def get_db():
-    return db
\ No newline at end of file
+    return db
+
+def user_with_goals_pipeline(user_id):
+    """Aggregation returning one user with their goals embedded, projected for analytics"""
+    projection = {"_id": 0}
+    projection.update({field: 1 for field in USER_ANALYTICS_FIELDS})
+    projection.update({f"goals.{field}": 1 for field in GOAL_ANALYTICS_FIELDS})
+    
+    return [
+        {"$match": {"user_id": user_id}},
+        {"$limit": 1},
+        {"$lookup": {"from": "goals", "localField": "user_id", "foreignField": "user_id", "as": "goals"}},
+        {"$project": projection}
+    ]
+
+def get_user_with_goals(user_id, database=None):
+    """Fetch a user and their goals in one round trip
+    
+    Returns (user, goals), or (None, []) when the user does not exist. MongoDB
+    resolves the goals with a single $lookup aggregation; the local store uses
+    its user_id hash indexes. Both are projected down to the fields the
+    analytics generators use.
+    """
+    if database is None:
+        database = get_db()
+    
+    if isinstance(database, LocalDatabase):
+        user = database.users.find_one({"user_id": user_id}, {field: 1 for field in USER_ANALYTICS_FIELDS})
+        if user is None:
+            return None, []
+        return user, list(database.goals.find({"user_id": user_id}, {field: 1 for field in GOAL_ANALYTICS_FIELDS}))
+    
+    user = next(database.users.aggregate(user_with_goals_pipeline(user_id)), None)
+    if user is None:
+        return None, []
+    return user, user.pop('goals', [])
+
+def get_user_with_totals(user_id, database=None):
+    """Fetch a user for insights: one indexed read when the user keeps running goal totals
+    
+    Returns (user, goals). Goals are loaded only for users created before the
+    totals existed, whose insights still sum the goal list.
+    """
+    if database is None:
+        database = get_db()
+    
+    user = database.users.find_one({"user_id": user_id}, {field: 1 for field in USER_ANALYTICS_FIELDS})
+    if user is None:
+        return None, []
+    if user.get('goals_count') is not None:
+        return user, []
+    return user, list(database.goals.find({"user_id": user_id}, {field: 1 for field in GOAL_ANALYTICS_FIELDS}))
+
+def init_async_db():
+    """Open pymongo's asyncio client for the async server when init_db() chose MongoDB
+    
+    Local stores have no async driver; the async server runs their calls in a
+    worker thread instead.
+    """
+    global async_client, async_db
+    if isinstance(db, LocalDatabase) or db is None:
+        async_client, async_db = None, None
+        return
+    async_client = AsyncMongoClient(Config.MONGODB_URI, event_listeners=[pool_stats, command_timings], **mongo_client_options())
+    async_db = async_client['finbuddy']
+
+async def get_user_with_goals_async(user_id):
+    """Async get_user_with_goals: awaits the $lookup aggregation without blocking the event loop"""
+    if async_db is None:
+        return await asyncio.to_thread(get_user_with_goals, user_id)
+    
+    cursor = await async_db.users.aggregate(user_with_goals_pipeline(user_id))
+    users = await cursor.to_list(1)
+    if not users:
+        return None, []
+    user = users[0]
+    return user, user.pop('goals', [])
+
+async def get_user_with_totals_async(user_id):
+    """Async get_user_with_totals"""
+    if async_db is None:
+        return await asyncio.to_thread(get_user_with_totals, user_id)
+    
+    user = await async_db.users.find_one({"user_id": user_id}, {field: 1 for field in USER_ANALYTICS_FIELDS})
+    if user is None:
+        return None, []
+    if user.get('goals_count') is not None:
+        return user, []
+    cursor = async_db.goals.find({"user_id": user_id}, {field: 1 for field in GOAL_ANALYTICS_FIELDS})
+    return user, await cursor.to_list(None)
@@ -41,6 +41,7 @@ const ChatInterface = ({ user }) => {
     try {
       const response = await axios.post('http://localhost:5000/api/chat', {
         message: inputMessage,
+        session_id: user.user_id,
         user_context: {
           age_bracket: user.age_bracket,
           status: user.status,
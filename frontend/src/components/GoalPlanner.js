@@ -20,7 +20,8 @@ const GoalPlanner = ({ user }) => {
         monthly_income: parseFloat(data.monthly_income || 0)
       };
 
-      const response = await axios.post('http://localhost:5000/api/goals', goalData);
+      // Only the first six milestones are rendered; the rest are counted from milestone_schedule
+      const response = await axios.post('http://localhost:5000/api/goals?page_size=6', goalData);
       setSavingsPlan(response.data.savings_plan);
       reset();
     } catch (error) {
@@ -185,8 +186,8 @@ const GoalPlanner = ({ user }) => {
                         <span className="text-sm font-medium text-gray-900">₹{milestone.target_amount.toFixed(0)}</span>
                       </div>
                     ))}
-                    {savingsPlan.milestones.length > 6 && (
-                      <p className="text-xs text-gray-500 text-center">...and {savingsPlan.milestones.length - 6} more months</p>
+                    {savingsPlan.milestone_schedule.count > 6 && (
+                      <p className="text-xs text-gray-500 text-center">...and {savingsPlan.milestone_schedule.count - 6} more months</p>
                     )}
                   </div>
                 </div>
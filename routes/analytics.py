@@ -1,118 +1,203 @@
-from flask import Blueprint, request, jsonify
-from database import get_db
-from datetime import datetime, timedelta
-import random
+from flask import Blueprint, request, jsonify, current_app
+from flask.json.provider import DefaultJSONProvider
+from config import Config
+from cohorts import cohort_stats
+from database import get_user_with_goals, get_user_with_totals
+from datetime import datetime, timedelta, date
+import hashlib
+import json
 import numpy as np
+from utils.cache import analytics_cache
 from utils.helpers import (
     get_income_multiplier, get_category_multiplier, get_seasonal_factor,
     get_category_color, get_investment_allocation, get_investment_growth_rate,
     get_investment_volatility, get_investment_color, calculate_financial_health_score,
     generate_recommendations, assess_financial_risk, get_market_insights_for_user,
-    get_tax_optimization_suggestions, compare_with_peers
+    get_tax_optimization_suggestions, compare_with_peers, goal_totals
 )
 
 analytics_bp = Blueprint('analytics', __name__)
 
-@analytics_bp.route('/api/analytics/time-series/<user_id>', methods=['GET'])
-def get_time_series_data(user_id):
-    try:
-        time_period = request.args.get('period', '1year')
-        chart_type = request.args.get('type', 'savings')
-        
-        # Generate realistic time series data based on user's goals and profile
-        db = get_db()
-        if isinstance(db, dict):
-            user_goals = [g for g in db['goals'] if g['user_id'] == user_id]
-            user = next((u for u in db['users'] if u['user_id'] == user_id), None)
-        else:
-            user_goals = list(db.goals.find({"user_id": user_id}))
-            user = db.users.find_one({"user_id": user_id})
-        
-        if not user:
-            return jsonify({"error": "User not found"}), 404
-        
+def json_default(value):
+    """jsonify's fallback for dates, decimals and UUIDs, plus NumPy scalars and arrays"""
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    return DefaultJSONProvider.default(value)
+
+def serialize(data):
+    """Serialize a payload once into the (body, etag) pair stored in the cache
+    
+    Encodes like Flask's jsonify (sorted keys, compact separators, the same
+    fallback for non-JSON types) but without needing an app context, so the
+    async server produces the same bytes.
+    """
+    body = (json.dumps(data, ensure_ascii=True, sort_keys=True, separators=(',', ':'),
+                       default=json_default) + "\n").encode()
+    return body, hashlib.blake2b(body, digest_size=16).hexdigest()
+
+def set_cache_headers(response, etag):
+    # no-cache: the browser revalidates every time, so a write shows up at once
+    # and an unchanged payload costs a 304
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+def json_response(cached):
+    """Build a conditional response from cached (body, etag)
+    
+    Cached and fresh responses are built from the same bytes, and a matching
+    If-None-Match turns into a 304 without touching the body.
+    """
+    body, etag = cached
+    response = current_app.response_class(body, mimetype='application/json')
+    return set_cache_headers(response, etag).make_conditional(request)
+
+def analytics_seed(*parts):
+    """Stable 64-bit seed for the given request parts and today's date
+    
+    Uses a cryptographic digest rather than hash() so every worker process
+    derives the same seed, which keeps responses (and their ETags) identical
+    for the whole day.
+    """
+    key = '|'.join(str(part) for part in (*parts, date.today().isoformat()))
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big')
+
+class InvalidQuery(ValueError):
+    """A query argument the analytics generators cannot use"""
+
+# Each *_query parses request args into (cache_key, build), where build(user, goals)
+# returns the payload. The sync handlers below and the async server share them.
+
+def time_series_query(user_id, args):
+    time_period = args.get('period', '1year')
+    chart_type = args.get('type', 'savings')
+    
+    def build(user, goals):
         # Generate time series based on period
-        data = generate_time_series_data(user, user_goals, time_period, chart_type)
+        return generate_time_series_data(user, goals, time_period, chart_type)
+    
+    return (user_id, 'time-series', time_period, chart_type), build
+
+def forecast_query(user_id, args):
+    time_period = args.get('period', '2years')
+    forecast_type = args.get('type', 'savings_projection')
+    mode = args.get('mode', 'deterministic')
+    paths = args.get('paths', Config.MONTE_CARLO_PATHS, type=int)
+    seed = args.get('seed', type=int)
+    if paths < 1:
+        raise InvalidQuery("paths must be a positive integer")
+    if seed is not None and seed < 0:
+        raise InvalidQuery("seed must be a non-negative integer")
+    
+    def build(user, goals):
+        return generate_forecast_data(user, goals, time_period, forecast_type, mode=mode, paths=paths, seed=seed)
+    
+    return (user_id, 'forecast', time_period, (forecast_type, mode, paths, seed)), build
+
+def insights_query(user_id, args):
+    return (user_id, 'insights', None, None), generate_user_insights
+
+def analytics_response(user_id, query, load=get_user_with_goals):
+    try:
+        cache_key, build = query(user_id, request.args)
+        cached = analytics_cache.get(cache_key)
+        if cached is None:
+            # Generate realistic analytics based on user's goals and profile
+            user, user_goals = load(user_id)
+            
+            if not user:
+                return jsonify({"error": "User not found"}), 404
+            
+            cached = analytics_cache.set(cache_key, serialize(build(user, user_goals)))
         
-        return jsonify(data)
+        return json_response(cached)
+    except InvalidQuery as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@analytics_bp.route('/api/analytics/time-series/<user_id>', methods=['GET'])
+def get_time_series_data(user_id):
+    return analytics_response(user_id, time_series_query)
+
 @analytics_bp.route('/api/analytics/forecast/<user_id>', methods=['GET'])
 def get_forecast_data(user_id):
-    try:
-        time_period = request.args.get('period', '2years')
-        forecast_type = request.args.get('type', 'savings_projection')
-        
-        db = get_db()
-        if isinstance(db, dict):
-            user_goals = [g for g in db['goals'] if g['user_id'] == user_id]
-            user = next((u for u in db['users'] if u['user_id'] == user_id), None)
-        else:
-            user_goals = list(db.goals.find({"user_id": user_id}))
-            user = db.users.find_one({"user_id": user_id})
-        
-        if not user:
-            return jsonify({"error": "User not found"}), 404
-        
-        forecast_data = generate_forecast_data(user, user_goals, time_period, forecast_type)
-        
-        return jsonify(forecast_data)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    return analytics_response(user_id, forecast_query)
 
 @analytics_bp.route('/api/analytics/insights/<user_id>', methods=['GET'])
 def get_user_insights(user_id):
-    try:
-        db = get_db()
-        if isinstance(db, dict):
-            user_goals = [g for g in db['goals'] if g['user_id'] == user_id]
-            user = next((u for u in db['users'] if u['user_id'] == user_id), None)
-        else:
-            user_goals = list(db.goals.find({"user_id": user_id}))
-            user = db.users.find_one({"user_id": user_id})
-        
-        if not user:
-            return jsonify({"error": "User not found"}), 404
-        
-        insights = generate_user_insights(user, user_goals)
-        
-        return jsonify(insights)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    # Insights read the user's running goal totals, not the goal list
+    return analytics_response(user_id, insights_query, load=get_user_with_totals)
+
+@analytics_bp.route('/api/analytics/cache/stats', methods=['GET'])
+def get_cache_stats():
+    return jsonify(analytics_cache.stats())
+
+@analytics_bp.route('/api/analytics/cohorts/stats', methods=['GET'])
+def get_cohort_stats():
+    return jsonify(cohort_stats.stats())
+
+# Period -> (lookback days, label format, sampling interval in days)
+TIME_SERIES_PERIODS = {
+    '3months': (90, '%Y-%m-%d', 7),     # Weekly data
+    '6months': (180, '%Y-%m-%d', 14),   # Bi-weekly data
+    '1year': (365, '%Y-%m', 30),        # Monthly data
+    '2years': (730, '%Y-%m', 30),       # Monthly data
+}
+DEFAULT_TIME_SERIES_PERIOD = '1year'
 
-def generate_time_series_data(user, goals, period, chart_type):
-    """Generate realistic time series data for different periods and chart types"""
+EXPENSE_CATEGORIES = ['Food', 'Rent', 'Transport', 'Entertainment', 'Utilities', 'Healthcare', 'Shopping']
+INVESTMENT_TYPES = ['Mutual Funds', 'PPF', 'FD', 'Gold ETF', 'Stocks']
+
+# Per-row lookup tables built once from the helper functions so every request
+# works on whole arrays instead of calling the helpers point by point
+FESTIVAL_SAVINGS_MONTHS = [10, 11, 3, 4]
+EXPENSE_MULTIPLIERS = np.array([get_category_multiplier(c) for c in EXPENSE_CATEGORIES])
+EXPENSE_SEASONALITY = np.array([[get_seasonal_factor(c, month) for month in range(1, 13)]
+                                for c in EXPENSE_CATEGORIES])
+INVESTMENT_ALLOCATIONS = np.array([get_investment_allocation(t) for t in INVESTMENT_TYPES])
+INVESTMENT_GROWTH_RATES = np.array([get_investment_growth_rate(t) for t in INVESTMENT_TYPES])
+INVESTMENT_VOLATILITIES = np.array([get_investment_volatility(t) for t in INVESTMENT_TYPES])
+
+def build_date_grid(start_date, end_date, interval_days, date_format):
+    """Return (labels, months) for every sample point between start and end date"""
+    points = (end_date - start_date).days // interval_days + 1
+    grid = np.datetime64(start_date.date(), 'D') + np.arange(points) * np.timedelta64(interval_days, 'D')
+    month_grid = grid.astype('datetime64[M]')
+    
+    if date_format == '%Y-%m':
+        labels = np.datetime_as_string(month_grid).tolist()
+    else:
+        labels = np.datetime_as_string(grid, unit='D').tolist()
+    
+    months = month_grid.astype(np.int64) % 12 + 1
+    return labels, months
+
+def to_amounts(values):
+    """Round a float array to non-negative whole rupees as plain Python ints"""
+    return np.maximum(np.rint(values), 0).astype(np.int64).tolist()
+
+def generate_time_series_data(user, goals, period, chart_type, rng=None):
+    """Generate realistic time series data for different periods and chart types
+    
+    All series of a chart are computed as one (series x points) array: the date
+    grid, the seasonal factor matrix and the noise are each produced in a single
+    NumPy call. Without an explicit `rng` the noise is seeded from the user,
+    period, chart type and date, so repeated requests return the same data.
+    """
+    if rng is None:
+        rng = np.random.default_rng(analytics_seed(user.get('user_id'), period, chart_type))
     
     # Determine date range based on period
+    lookback_days, date_format, interval_days = TIME_SERIES_PERIODS.get(
+        period, TIME_SERIES_PERIODS[DEFAULT_TIME_SERIES_PERIOD])
     end_date = datetime.now()
-    if period == '3months':
-        start_date = end_date - timedelta(days=90)
-        date_format = '%Y-%m-%d'
-        interval_days = 7  # Weekly data
-    elif period == '6months':
-        start_date = end_date - timedelta(days=180)
-        date_format = '%Y-%m-%d'
-        interval_days = 14  # Bi-weekly data
-    elif period == '1year':
-        start_date = end_date - timedelta(days=365)
-        date_format = '%Y-%m'
-        interval_days = 30  # Monthly data
-    elif period == '2years':
-        start_date = end_date - timedelta(days=730)
-        date_format = '%Y-%m'
-        interval_days = 30  # Monthly data
-    else:
-        start_date = end_date - timedelta(days=365)
-        date_format = '%Y-%m'
-        interval_days = 30
+    start_date = end_date - timedelta(days=lookback_days)
     
     # Generate date labels
-    dates = []
-    current_date = start_date
-    while current_date <= end_date:
-        dates.append(current_date.strftime(date_format))
-        current_date += timedelta(days=interval_days)
+    dates, months = build_date_grid(start_date, end_date, interval_days, date_format)
+    points = len(dates)
     
     # Base amounts based on user profile
     income_multiplier = get_income_multiplier(user.get('monthly_income_range', '15k-30k'))
@@ -120,24 +205,18 @@ def generate_time_series_data(user, goals, period, chart_type):
     if chart_type == 'savings':
         # Savings growth with realistic patterns
         base_savings = 1000 * income_multiplier
-        growth_rate = 0.08 + random.uniform(-0.02, 0.02)  # 6-10% monthly growth
+        growth_rate = 0.08 + rng.uniform(-0.02, 0.02)  # 6-10% monthly growth
         
-        values = []
-        current_value = base_savings
-        for i, date in enumerate(dates):
-            # Add seasonal variations (higher savings in festival months)
-            seasonal_factor = 1.2 if current_date.month in [10, 11, 3, 4] else 1.0
-            monthly_growth = current_value * growth_rate * seasonal_factor
-            noise = random.uniform(-0.1, 0.1) * monthly_growth
-            current_value += monthly_growth + noise
-            values.append(max(0, round(current_value)))
-            current_date = start_date + timedelta(days=interval_days * i)
+        # Higher savings in festival months, +/-10% noise on every step's growth
+        seasonal_factor = np.where(np.isin(months, FESTIVAL_SAVINGS_MONTHS), 1.2, 1.0)
+        noise = rng.uniform(-0.1, 0.1, points)
+        values = base_savings * np.cumprod(1 + growth_rate * seasonal_factor * (1 + noise))
         
         return {
             "labels": dates,
             "datasets": [{
                 "label": "Savings Amount (₹)",
-                "data": values,
+                "data": to_amounts(values),
                 "trend": "upward",
                 "growth_rate": f"{growth_rate*100:.1f}%"
             }]
@@ -147,26 +226,16 @@ def generate_time_series_data(user, goals, period, chart_type):
         # Monthly expenses with variations
         base_expenses = 15000 * income_multiplier
         
-        categories = ['Food', 'Rent', 'Transport', 'Entertainment', 'Utilities', 'Healthcare', 'Shopping']
-        datasets = []
+        # Seasonal variations for different categories: (categories x points)
+        seasonal_factor = EXPENSE_SEASONALITY[:, months - 1]
+        noise = rng.uniform(-0.15, 0.15, seasonal_factor.shape)
+        values = (base_expenses * EXPENSE_MULTIPLIERS)[:, None] * seasonal_factor * (1 + noise)
         
-        for category in categories:
-            values = []
-            category_base = base_expenses * get_category_multiplier(category)
-            
-            for i, date in enumerate(dates):
-                current_date = start_date + timedelta(days=interval_days * i)
-                # Seasonal variations for different categories
-                seasonal_factor = get_seasonal_factor(category, current_date.month)
-                monthly_expense = category_base * seasonal_factor
-                noise = random.uniform(-0.15, 0.15) * monthly_expense
-                values.append(max(0, round(monthly_expense + noise)))
-            
-            datasets.append({
-                "label": category,
-                "data": values,
-                "backgroundColor": get_category_color(category)
-            })
+        datasets = [{
+            "label": category,
+            "data": data,
+            "backgroundColor": get_category_color(category)
+        } for category, data in zip(EXPENSE_CATEGORIES, to_amounts(values))]
         
         return {
             "labels": dates,
@@ -175,31 +244,21 @@ def generate_time_series_data(user, goals, period, chart_type):
     
     elif chart_type == 'investments':
         # Investment portfolio performance
-        investment_types = ['Mutual Funds', 'PPF', 'FD', 'Gold ETF', 'Stocks']
-        datasets = []
-        
         total_investment = 50000 * income_multiplier
         
-        for inv_type in investment_types:
-            values = []
-            type_allocation = get_investment_allocation(inv_type) * total_investment
-            
-            for i, date in enumerate(dates):
-                # Different growth patterns for different investment types
-                growth_rate = get_investment_growth_rate(inv_type)
-                time_factor = i / len(dates)
-                current_value = type_allocation * (1 + growth_rate * time_factor)
-                
-                # Add market volatility
-                volatility = get_investment_volatility(inv_type)
-                noise = random.uniform(-volatility, volatility) * current_value
-                values.append(max(0, round(current_value + noise)))
-            
-            datasets.append({
-                "label": inv_type,
-                "data": values,
-                "backgroundColor": get_investment_color(inv_type)
-            })
+        # Different growth patterns for different investment types
+        time_factor = np.arange(points) / points
+        trend = (INVESTMENT_ALLOCATIONS * total_investment)[:, None] * (1 + INVESTMENT_GROWTH_RATES[:, None] * time_factor)
+        
+        # Add market volatility
+        noise = rng.uniform(-1.0, 1.0, trend.shape) * INVESTMENT_VOLATILITIES[:, None]
+        values = trend * (1 + noise)
+        
+        datasets = [{
+            "label": inv_type,
+            "data": data,
+            "backgroundColor": get_investment_color(inv_type)
+        } for inv_type, data in zip(INVESTMENT_TYPES, to_amounts(values))]
         
         return {
             "labels": dates,
@@ -208,8 +267,109 @@ def generate_time_series_data(user, goals, period, chart_type):
     
     return {"labels": dates, "datasets": []}
 
-def generate_forecast_data(user, goals, period, forecast_type):
-    """Generate predictive forecasting data"""
+def portfolio_return_profile():
+    """Annual expected return and volatility of the default instrument mix
+    
+    Instruments are treated as independent, so the portfolio variance is the
+    allocation-weighted sum of each instrument's variance.
+    """
+    expected_return = float(INVESTMENT_ALLOCATIONS @ INVESTMENT_GROWTH_RATES)
+    volatility = float(np.sqrt(np.sum((INVESTMENT_ALLOCATIONS * INVESTMENT_VOLATILITIES) ** 2)))
+    return expected_return, volatility
+
+def simulate_savings_paths(initial_amount, contribution, steps, step_years, paths, rng):
+    """Simulate portfolio value paths as one float32 (steps x paths) array
+    
+    Every step adds the contribution and then applies a normally distributed
+    return, i.e. W[t] = (W[t-1] + contribution) * (1 + r[t]). The recurrence is
+    solved in closed form with cumulative products so no Python loop runs over
+    paths or steps. Each step is one contiguous row, which keeps the cumulative
+    products and the per-step percentiles cache-friendly.
+    """
+    expected_return, volatility = portfolio_return_profile()
+    growth = rng.standard_normal((steps, paths), dtype=np.float32)
+    growth *= np.float32(volatility * np.sqrt(step_years))
+    growth += np.float32(1 + expected_return * step_years)
+    np.cumprod(growth, axis=0, out=growth)
+    
+    # Growth factor in force before each step's contribution: 1, G[0], ..., G[steps-2]
+    discount = np.empty_like(growth)
+    discount[0] = 1.0
+    np.divide(1, growth[:-1], out=discount[1:])
+    np.cumsum(discount, axis=0, out=discount)
+    discount *= np.float32(contribution)
+    discount += np.float32(initial_amount)
+    growth *= discount
+    return growth
+
+def path_percentiles(values, percentiles):
+    """Per-step percentiles of a (steps x paths) array, interpolated like np.percentile
+    
+    np.partition only places the two ranks around each percentile instead of
+    sorting every row.
+    """
+    last = values.shape[1] - 1
+    positions = np.asarray(percentiles, dtype=float) / 100 * last
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.minimum(lower + 1, last)
+    ranked = np.partition(values, np.unique(np.concatenate([lower, upper])), axis=1)
+    fractions = (positions - lower).astype(np.float32)
+    return [ranked[:, low] + (ranked[:, high] - ranked[:, low]) * fraction
+            for low, high, fraction in zip(lower, upper, fractions)]
+
+def generate_monte_carlo_projection(dates, interval_days, current_savings, monthly_savings_rate, paths, seed=None):
+    """Percentile bands (p5/p50/p95) of simulated savings at every forecast date"""
+    steps = len(dates)
+    step_years = interval_days / 365
+    
+    # Keep the simulation inside a fixed (steps x paths) budget whatever the period
+    paths = max(1, min(paths, Config.MONTE_CARLO_MAX_CELLS // steps))
+    
+    values = simulate_savings_paths(
+        current_savings, monthly_savings_rate * 12 * step_years, steps, step_years, paths,
+        np.random.default_rng(seed)
+    )
+    p5, p50, p95 = path_percentiles(values, (5, 50, 95))
+    expected_return, volatility = portfolio_return_profile()
+    
+    return {
+        "labels": dates,
+        "datasets": [
+            {
+                "label": "Median Projection (P50)",
+                "data": to_amounts(p50),
+                "borderColor": "rgb(59, 130, 246)",
+                "backgroundColor": "rgba(59, 130, 246, 0.1)"
+            },
+            {
+                "label": "Optimistic Band (P95)",
+                "data": to_amounts(p95),
+                "borderColor": "rgb(34, 197, 94)",
+                "backgroundColor": "rgba(34, 197, 94, 0.1)"
+            },
+            {
+                "label": "Pessimistic Band (P5)",
+                "data": to_amounts(p5),
+                "borderColor": "rgb(239, 68, 68)",
+                "backgroundColor": "rgba(239, 68, 68, 0.1)"
+            }
+        ],
+        "simulation": {
+            "mode": "montecarlo",
+            "paths": paths,
+            "seed": seed,
+            "expected_annual_return": f"{expected_return*100:.1f}%",
+            "annual_volatility": f"{volatility*100:.1f}%"
+        }
+    }
+
+def generate_forecast_data(user, goals, period, forecast_type, mode='deterministic', paths=None, seed=None):
+    """Generate predictive forecasting data
+    
+    With mode='montecarlo' the savings projection is simulated over `paths`
+    random return paths and reported as percentile bands. Without an explicit
+    `seed` one is derived from the user, period and date.
+    """
     
     # Future date range
     start_date = datetime.now()
@@ -241,6 +401,14 @@ def generate_forecast_data(user, goals, period, forecast_type):
         # Project savings growth based on current patterns
         current_savings = sum(goal.get('current_amount', 0) for goal in goals)
         monthly_savings_rate = 5000 * income_multiplier
+        
+        if mode == 'montecarlo':
+            if seed is None:
+                seed = analytics_seed(user.get('user_id'), period, 'montecarlo')
+            return generate_monte_carlo_projection(
+                dates, interval_days, current_savings, monthly_savings_rate,
+                paths or Config.MONTE_CARLO_PATHS, seed
+            )
         annual_growth_rate = 0.12  # 12% annual returns
         
         projections = []
@@ -325,9 +493,7 @@ def generate_forecast_data(user, goals, period, forecast_type):
 def generate_user_insights(user, goals):
     """Generate AI-powered insights for the user"""
     
-    total_goals = len(goals)
-    total_target = sum(goal.get('target_amount', 0) for goal in goals)
-    total_current = sum(goal.get('current_amount', 0) for goal in goals)
+    total_goals, total_target, total_current = goal_totals(user, goals)
     completion_rate = (total_current / total_target * 100) if total_target > 0 else 0
     
     income_range = user.get('monthly_income_range', '15k-30k')
@@ -342,7 +508,7 @@ def generate_user_insights(user, goals):
         "risk_assessment": assess_financial_risk(user, goals),
         "market_insights": get_market_insights_for_user(user),
         "tax_optimization": get_tax_optimization_suggestions(user),
-        "benchmark_comparison": compare_with_peers(user, goals)
+        "benchmark_comparison": compare_with_peers(user, goals, cohort_stats.lookup(user))
     }
     
     return insights
\ No newline at end of file
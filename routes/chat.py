@@ -1,28 +1,289 @@
-from flask import Blueprint, request, jsonify
-from langchain_openai import OpenAI
-from langchain.chains import ConversationChain
-from langchain.memory import ConversationBufferMemory
+from flask import Blueprint, Response, request, jsonify
 from config import Config
+from utils.chat_memory import ChatSessionStore
+from utils.response_cache import response_cache
+from utils.llm_gate import llm_gate, LLMBusy
+from utils.keyword_router import KeywordRouter
+from utils.metrics import llm_request_duration, llm_prompt_tokens, llm_completion_tokens, chat_replies
+import asyncio
 import json
+import threading
+import time
 
 chat_bp = Blueprint('chat', __name__)
 
-# Initialize AI components with error handling
-memory = ConversationBufferMemory()
+# Created by get_llm() on the first chat request that needs it, so langchain and
+# openai are never imported by processes that only serve fallback answers
 llm = None
-conversation = None
+_llm_failed = False
+_llm_lock = threading.Lock()
+
+# Bounded per-session history replaces one ever-growing buffer shared by every user
+sessions = ChatSessionStore(
+    max_turns=Config.CHAT_MEMORY_TURNS,
+    max_sessions=Config.CHAT_MAX_SESSIONS,
+    idle_seconds=Config.CHAT_SESSION_IDLE_SECONDS,
+    max_total_chars=Config.CHAT_MEMORY_MAX_CHARS
+)
+
+_encoding = None
 
 def init_ai():
-    global llm, conversation
+    if Config.OPENAI_API_KEY:
+        print("AI chat enabled - the LLM client loads on the first chat request")
+    else:
+        print("No OpenAI API key found - AI chat will use fallback responses")
+
+def get_llm():
+    """The LLM client, imported and created on first use; None when unavailable"""
+    global llm, _llm_failed
+    if llm is None and Config.OPENAI_API_KEY and not _llm_failed:
+        with _llm_lock:
+            if llm is None and not _llm_failed:
+                try:
+                    from langchain_openai import OpenAI
+                    llm = OpenAI(temperature=0.7, api_key=Config.OPENAI_API_KEY)
+                    print("AI chat initialized successfully")
+                except Exception as e:
+                    _llm_failed = True
+                    print(f"AI initialization failed: {e} - Using fallback responses")
+    return llm
+
+async def aget_llm():
+    """get_llm for the async server: the first call's import runs in a thread, off the event loop"""
+    if llm is not None or not Config.OPENAI_API_KEY or _llm_failed:
+        return llm
+    return await asyncio.to_thread(get_llm)
+
+def count_tokens(text):
+    """Prompt size in tokens (cl100k_base), or a 4-chars-per-token estimate without tiktoken"""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = False
+    if _encoding is False:
+        return max(1, len(text) // 4)
+    return len(_encoding.encode(text))
+
+def session_key(data, user_context, remote_addr):
+    """Chat history is kept per session_id, falling back to the user's id or the client address"""
+    return data.get('session_id') or user_context.get('user_id') or f"anonymous:{remote_addr}"
+
+def format_history(history):
+    return "\n".join(f"Human: {question}\nFinBuddy: {answer}" for question, answer in history)
+
+# Instruction block shared by every chat request. It is built once and always
+# sent first, so providers can reuse their cached prefix across requests.
+SYSTEM_PROMPT = """You are FinBuddy, an expert AI financial literacy coach specialized in Indian financial markets and systems for young Indians (16-25).
+
+IMPORTANT: Always provide India-specific advice covering:
+
+🏦 BANKING & SAVINGS:
+- Indian bank account types (Savings, Current, FD, RD)
+- Best Indian banks for students/professionals (SBI, HDFC, ICICI, etc.)
+- Digital banking apps (Google Pay, PhonePe, Paytm)
+- Interest rates in Indian context (6-8% for savings)
+
+📈 INVESTMENT OPTIONS:
+- Mutual Funds (SIP starting ₹500)
+- Stock Market basics (NSE, BSE)
+- Government schemes (PPF, EPF, NSC, ELSS)
+- Gold investments (Digital Gold, Gold ETFs)
+- Cryptocurrency regulations in India
+
+🛡️ INSURANCE:
+- Health insurance importance in India
+- Term life insurance
+- Two-wheeler/car insurance
+- Crop insurance for rural areas
+
+💰 GOVERNMENT SCHEMES:
+- PM Kisan Samman Nidhi
+- Atal Pension Yojana
+- Sukanya Samriddhi Yojana
+- Jan Dhan Yojana benefits
+- Pradhan Mantri Mudra Yojana for entrepreneurs
+
+💡 PRACTICAL TIPS:
+- Tax saving under Section 80C
+- Building CIBIL credit score
+- Festival budgeting (Diwali, weddings)
+- Dealing with inflation in Indian context
+- Emergency fund = 6-12 months expenses (higher due to job market volatility)
+
+Always provide:
+1. Actionable steps with specific Indian amounts (₹)
+2. Relevant government schemes/apps
+3. Cultural context (joint family expenses, festivals)
+4. Risk warnings for investments
+5. Simple language with Hindi terms when helpful
+
+Respond in a friendly, encouraging tone with emoji usage and practical examples.
+
+"""
+
+_prefix_tokens = None
+
+def build_context_prompt(message, user_context, history=()):
+    """SYSTEM_PROMPT followed by the per-request part: profile, recent turns and question"""
+    return (
+        f"{SYSTEM_PROMPT}User Profile: {json.dumps(user_context, sort_keys=True)}\n\n"
+        f"Conversation so far:\n{format_history(history) or '(none)'}\n\n"
+        f"User Question: {message}\n"
+    )
+
+def prompt_usage(prompt):
+    """Prompt size in tokens and how many of them are the shared SYSTEM_PROMPT prefix"""
+    global _prefix_tokens
+    if _prefix_tokens is None:
+        _prefix_tokens = count_tokens(SYSTEM_PROMPT)
+    return {"prompt_tokens": count_tokens(prompt), "cached_prefix_tokens": _prefix_tokens}
+
+# Fallback answers never reach the LLM
+NO_PROMPT_USAGE = {"prompt_tokens": 0, "cached_prefix_tokens": 0}
+
+def cached_answer(message, user_context, history):
+    """Shared answer for a first-turn question; follow-ups depend on the conversation"""
+    answer = None if history else response_cache.get(message, user_context)
+    if answer is not None:
+        chat_replies.inc(1, 'cache')
+    return answer
+
+def finish_llm_reply(session_id, message, user_context, history, prompt, answer, latency, mode, coalesced=False):
+    """Record an LLM answer in the session, the response cache and metrics; returns its usage
+
+    A coalesced caller shared another caller's upstream call, which already
+    cached the answer and recorded its latency and tokens.
+    """
+    sessions.append(session_id, message, answer)
+    usage = prompt_usage(prompt)
+    if coalesced:
+        chat_replies.inc(1, 'coalesced')
+        return usage
+    if not history:
+        response_cache.set(message, user_context, answer, latency)
+    llm_request_duration.observe(latency, mode)
+    llm_prompt_tokens.inc(usage["prompt_tokens"])
+    llm_completion_tokens.inc(count_tokens(answer))
+    chat_replies.inc(1, 'llm')
+    return usage
+
+def generate_reply(message, user_context, session_id):
+    """Answer a chat message with the LLM when available, otherwise with fallback responses
+    
+    Returns (answer, usage) where usage is prompt_usage() of the prompt sent,
+    or zeros for cached and fallback answers. When every LLM slot stays busy
+    for the queue budget the fallback answer is used as well.
+    """
+    model = get_llm()
+    if model:
+        history = sessions.history(session_id)
+        answer = cached_answer(message, user_context, history)
+        if answer is not None:
+            sessions.append(session_id, message, answer)
+            return answer, NO_PROMPT_USAGE
+        prompt = build_context_prompt(message, user_context, history)
+        started = time.perf_counter()
+        try:
+            answer, coalesced = llm_gate.call(prompt, lambda: model.invoke(prompt))
+        except LLMBusy:
+            return get_fallback_response(message.lower(), user_context), NO_PROMPT_USAGE
+        return answer, finish_llm_reply(session_id, message, user_context, history, prompt, answer,
+                                        time.perf_counter() - started, 'invoke', coalesced)
+    # Fallback responses for common questions
+    return get_fallback_response(message.lower(), user_context), NO_PROMPT_USAGE
+
+async def agenerate_reply(message, user_context, session_id):
+    """Async variant of generate_reply used by the ASGI server"""
+    model = await aget_llm()
+    if model:
+        history = sessions.history(session_id)
+        answer = cached_answer(message, user_context, history)
+        if answer is not None:
+            sessions.append(session_id, message, answer)
+            return answer, NO_PROMPT_USAGE
+        prompt = build_context_prompt(message, user_context, history)
+        started = time.perf_counter()
+        try:
+            answer, coalesced = await llm_gate.acall(prompt, lambda: model.ainvoke(prompt))
+        except LLMBusy:
+            return get_fallback_response(message.lower(), user_context), NO_PROMPT_USAGE
+        return answer, finish_llm_reply(session_id, message, user_context, history, prompt, answer,
+                                        time.perf_counter() - started, 'ainvoke', coalesced)
+    return get_fallback_response(message.lower(), user_context), NO_PROMPT_USAGE
+
+# Streamed replies are a series of `token` events with {"text": ...} followed by
+# one `done` event carrying the prompt usage, or an `error` event.
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode()
+
+def stream_reply(message, user_context, session_id):
+    """Yield SSE events for a reply as the LLM produces tokens
+
+    Streams hold an LLM slot for their whole duration but are not coalesced.
+    """
     try:
-        if Config.OPENAI_API_KEY:
-            llm = OpenAI(temperature=0.7, api_key=Config.OPENAI_API_KEY)
-            conversation = ConversationChain(llm=llm, memory=memory, verbose=True)
-            print("AI chat initialized successfully")
-        else:
-            print("No OpenAI API key found - AI chat will use fallback responses")
+        model = get_llm()
+        history = sessions.history(session_id) if model else ()
+        answer = cached_answer(message, user_context, history) if model else None
+        usage = NO_PROMPT_USAGE
+        if answer is not None:
+            yield sse_event("token", {"text": answer})
+            sessions.append(session_id, message, answer)
+        elif model:
+            prompt = build_context_prompt(message, user_context, history)
+            started = time.perf_counter()
+            parts = []
+            try:
+                with llm_gate.slot():
+                    for token in model.stream(prompt):
+                        parts.append(token)
+                        yield sse_event("token", {"text": token})
+                answer = "".join(parts)
+                usage = finish_llm_reply(session_id, message, user_context, history, prompt, answer,
+                                         time.perf_counter() - started, 'stream')
+            except LLMBusy:
+                pass
+        if answer is None:
+            yield fallback_events(message, user_context)
+        yield sse_event("done", usage)
     except Exception as e:
-        print(f"AI initialization failed: {e} - Using fallback responses")
+        yield sse_event("error", {"error": str(e)})
+
+async def astream_reply(message, user_context, session_id):
+    """Async variant of stream_reply used by the ASGI server"""
+    try:
+        model = await aget_llm()
+        history = sessions.history(session_id) if model else ()
+        answer = cached_answer(message, user_context, history) if model else None
+        usage = NO_PROMPT_USAGE
+        if answer is not None:
+            yield sse_event("token", {"text": answer})
+            sessions.append(session_id, message, answer)
+        elif model:
+            prompt = build_context_prompt(message, user_context, history)
+            started = time.perf_counter()
+            parts = []
+            try:
+                async with llm_gate.aslot():
+                    async for token in model.astream(prompt):
+                        parts.append(token)
+                        yield sse_event("token", {"text": token})
+                answer = "".join(parts)
+                usage = finish_llm_reply(session_id, message, user_context, history, prompt, answer,
+                                         time.perf_counter() - started, 'astream')
+            except LLMBusy:
+                pass
+        if answer is None:
+            yield fallback_events(message, user_context)
+        yield sse_event("done", usage)
+    except Exception as e:
+        yield sse_event("error", {"error": str(e)})
 
 @chat_bp.route('/api/chat', methods=['POST'])
 def chat():
@@ -31,77 +292,63 @@ def chat():
         message = data.get('message', '')
         user_context = data.get('user_context', {})
         
-        # Use AI if available, otherwise use fallback responses
-        if conversation:
-            context_prompt = f"""
-            You are FinBuddy, an expert AI financial literacy coach specialized in Indian financial markets and systems for young Indians (16-25).
-            
-            User Profile: {json.dumps(user_context)}
-            
-            IMPORTANT: Always provide India-specific advice covering:
-            
-            🏦 BANKING & SAVINGS:
-            - Indian bank account types (Savings, Current, FD, RD)
-            - Best Indian banks for students/professionals (SBI, HDFC, ICICI, etc.)
-            - Digital banking apps (Google Pay, PhonePe, Paytm)
-            - Interest rates in Indian context (6-8% for savings)
-            
-            📈 INVESTMENT OPTIONS:
-            - Mutual Funds (SIP starting ₹500)
-            - Stock Market basics (NSE, BSE)
-            - Government schemes (PPF, EPF, NSC, ELSS)
-            - Gold investments (Digital Gold, Gold ETFs)
-            - Cryptocurrency regulations in India
-            
-            🛡️ INSURANCE:
-            - Health insurance importance in India
-            - Term life insurance
-            - Two-wheeler/car insurance
-            - Crop insurance for rural areas
-            
-            💰 GOVERNMENT SCHEMES:
-            - PM Kisan Samman Nidhi
-            - Atal Pension Yojana
-            - Sukanya Samriddhi Yojana
-            - Jan Dhan Yojana benefits
-            - Pradhan Mantri Mudra Yojana for entrepreneurs
-            
-            💡 PRACTICAL TIPS:
-            - Tax saving under Section 80C
-            - Building CIBIL credit score
-            - Festival budgeting (Diwali, weddings)
-            - Dealing with inflation in Indian context
-            - Emergency fund = 6-12 months expenses (higher due to job market volatility)
-            
-            Always provide:
-            1. Actionable steps with specific Indian amounts (₹)
-            2. Relevant government schemes/apps
-            3. Cultural context (joint family expenses, festivals)
-            4. Risk warnings for investments
-            5. Simple language with Hindi terms when helpful
-            
-            User Question: {message}
-            
-            Respond in a friendly, encouraging tone with emoji usage and practical examples.
-            """
-            
-            response = conversation.predict(input=context_prompt)
-        else:
-            # Fallback responses for common questions
-            response = get_fallback_response(message.lower(), user_context)
+        if not get_llm():
+            return Response(fallback_body(message, user_context), mimetype='application/json')
+        
+        response, usage = generate_reply(
+            message, user_context, session_key(data, user_context, request.remote_addr)
+        )
         
         return jsonify({
             "message": response,
+            **usage,
             "status": "success"
         })
     except Exception as e:
         return jsonify({"error": str(e), "status": "error"}), 500
 
-def get_fallback_response(message, user_context):
-    """Provide comprehensive Indian financial advice when AI is not available"""
-    
-    if any(word in message for word in ['save', 'saving', 'money']):
-        return """💰 Smart Saving Strategies for Indians:
+@chat_bp.route('/api/chat/stream', methods=['POST'])
+def chat_stream():
+    """Same request body as /api/chat, answered as Server-Sent Events"""
+    try:
+        data = request.get_json()
+        message = data.get('message', '')
+        user_context = data.get('user_context', {})
+        session_id = session_key(data, user_context, request.remote_addr)
+        
+        return Response(stream_reply(message, user_context, session_id),
+                        mimetype='text/event-stream', headers=SSE_HEADERS)
+    except Exception as e:
+        return jsonify({"error": str(e), "status": "error"}), 500
+
+@chat_bp.route('/api/chat/sessions/stats', methods=['GET'])
+def chat_session_stats():
+    return jsonify(sessions.stats())
+
+@chat_bp.route('/api/chat/cache/stats', methods=['GET'])
+def chat_cache_stats():
+    return jsonify(response_cache.stats())
+
+@chat_bp.route('/api/chat/llm/stats', methods=['GET'])
+def chat_llm_stats():
+    return jsonify(llm_gate.stats())
+
+# Fallback intents in priority order: (intent, keywords matched as substrings)
+FALLBACK_INTENTS = [
+    ('saving', ['save', 'saving', 'money']),
+    ('investment', ['investment', 'invest', 'stocks', 'mutual', 'fund']),
+    ('insurance', ['insurance', 'health', 'term', 'life']),
+    ('emergency_fund', ['emergency', 'fund']),
+    ('budgeting', ['budget', 'budgeting', 'expense']),
+    ('tax', ['tax', 'section', '80c', 'savings']),
+    ('goals', ['goal', 'dream', 'target', 'plan']),
+    ('crypto', ['crypto', 'bitcoin', 'cryptocurrency']),
+]
+
+fallback_router = KeywordRouter(FALLBACK_INTENTS)
+
+FALLBACK_ANSWERS = {
+    'saving': """💰 Smart Saving Strategies for Indians:
 
 🏦 BANK ACCOUNTS:
 • SBI/HDFC/ICICI - Compare interest rates (6-8%)
@@ -125,10 +372,9 @@ def get_fallback_response(message, user_context):
 3. ELSS mutual funds (3-year lock, tax saving)
 4. Equity mutual funds (long-term wealth)
 
-Even ₹500/month SIP becomes ₹10+ lakhs in 15 years with 12% returns!"""
+Even ₹500/month SIP becomes ₹10+ lakhs in 15 years with 12% returns!""",
 
-    elif any(word in message for word in ['investment', 'invest', 'stocks', 'mutual', 'fund']):
-        return """📈 Investment Guide for Young Indians:
+    'investment': """📈 Investment Guide for Young Indians:
 
 🎯 BEGINNER-FRIENDLY OPTIONS:
 • SIP in Large Cap Mutual Funds - Start ₹500/month
@@ -153,10 +399,9 @@ Even ₹500/month SIP becomes ₹10+ lakhs in 15 years with 12% returns!"""
 • Never put emergency fund in equity
 • Start with 70% debt, 30% equity allocation
 
-💡 PRO TIP: Start SIP on salary date for consistency!"""
+💡 PRO TIP: Start SIP on salary date for consistency!""",
 
-    elif any(word in message for word in ['insurance', 'health', 'term', 'life']):
-        return """🛡️ Essential Insurance for Indians:
+    'insurance': """🛡️ Essential Insurance for Indians:
 
 🏥 HEALTH INSURANCE (CRITICAL):
 • Family floater - ₹5-10 lakh coverage
@@ -181,10 +426,9 @@ Even ₹500/month SIP becomes ₹10+ lakhs in 15 years with 12% returns!"""
 • PM-JAY for eligible families
 • Atal Pension Yojana for retirement
 
-✅ INSURANCE MANTRA: Buy term, invest the rest!"""
+✅ INSURANCE MANTRA: Buy term, invest the rest!""",
 
-    elif any(word in message for word in ['emergency', 'fund']):
-        return """🚨 Emergency Fund for Indians:
+    'emergency_fund': """🚨 Emergency Fund for Indians:
 
 💰 TARGET AMOUNT:
 • 6-12 months of expenses (higher than global standard)
@@ -211,10 +455,9 @@ Even ₹500/month SIP becomes ₹10+ lakhs in 15 years with 12% returns!"""
 
 🎯 What qualifies as emergency:
 ✅ Job loss, medical bills, family crisis, home repairs
-❌ Festivals, shopping, vacations, gadgets"""
+❌ Festivals, shopping, vacations, gadgets""",
 
-    elif any(word in message for word in ['budget', 'budgeting', 'expense']):
-        return """📊 Smart Budgeting for Indian Youth:
+    'budgeting': """📊 Smart Budgeting for Indian Youth:
 
 🏠 INDIAN FAMILY BUDGET MODEL:
 • 30% - Needs (rent, groceries, utilities)
@@ -245,10 +488,9 @@ Even ₹500/month SIP becomes ₹10+ lakhs in 15 years with 12% returns!"""
 🎉 FESTIVAL BUDGETING:
 • Diwali: ₹15,000 (gifts, celebration, shopping)
 • Wedding season: ₹25,000 (clothes, gifts, travel)
-• Start saving 8-10 months in advance!"""
+• Start saving 8-10 months in advance!""",
 
-    elif any(word in message for word in ['tax', 'section', '80c', 'savings']):
-        return """💰 Tax Saving Guide for Indians:
+    'tax': """💰 Tax Saving Guide for Indians:
 
 📋 SECTION 80C (₹1.5 LAKH LIMIT):
 • EPF contribution - Automatic deduction
@@ -276,10 +518,9 @@ Even ₹500/month SIP becomes ₹10+ lakhs in 15 years with 12% returns!"""
 • Keep investment proofs ready
 • Use new tax regime if no deductions
 
-⚠️ AVOID: Insurance as investment, closing PPF early, panic March investments"""
+⚠️ AVOID: Insurance as investment, closing PPF early, panic March investments""",
 
-    elif any(word in message for word in ['goal', 'dream', 'target', 'plan']):
-        return """🎯 Goal-Based Financial Planning:
+    'goals': """🎯 Goal-Based Financial Planning:
 
 💍 COMMON INDIAN FINANCIAL GOALS:
 • Marriage (₹10-25 lakhs) - 3-7 years
@@ -312,10 +553,9 @@ Even ₹500/month SIP becomes ₹10+ lakhs in 15 years with 12% returns!"""
 • Plan for festival expenses annually
 • Factor in family wedding contributions
 • Consider joint family responsibilities
-• Plan for parents' medical needs"""
+• Plan for parents' medical needs""",
 
-    elif any(word in message for word in ['crypto', 'bitcoin', 'cryptocurrency']):
-        return """₿ Cryptocurrency in India - Complete Guide:
+    'crypto': """₿ Cryptocurrency in India - Complete Guide:
 
 ⚖️ LEGAL STATUS (2024):
 • Legal to hold and trade crypto
@@ -354,9 +594,18 @@ Even ₹500/month SIP becomes ₹10+ lakhs in 15 years with 12% returns!"""
 • International mutual funds
 • REITs for real estate exposure
 • Direct equity for growth"""
+}
 
-    else:
-        return f"""🙏 Namaste! I'm FinBuddy, your comprehensive Indian financial advisor! 
+# Static answers pre-encoded once: as a JSON string for /api/chat and as the
+# complete SSE token stream for /api/chat/stream
+FALLBACK_JSON = {intent: json.dumps(answer).encode() for intent, answer in FALLBACK_ANSWERS.items()}
+FALLBACK_EVENTS = {
+    intent: b"".join(sse_event("token", {"text": line}) for line in answer.splitlines(keepends=True))
+    for intent, answer in FALLBACK_ANSWERS.items()
+}
+
+def default_fallback_response(user_context):
+    return f"""🙏 Namaste! I'm FinBuddy, your comprehensive Indian financial advisor! 
 
 👤 Your Profile: {user_context.get('status', 'User').title()}, Income: {user_context.get('monthly_income_range', 'Not specified')}
 
@@ -391,4 +640,32 @@ Even ₹500/month SIP becomes ₹10+ lakhs in 15 years with 12% returns!"""
 💡 Ask me about:
 "Best SIP for ₹2000/month", "Health insurance for family", "Tax saving options", "Emergency fund size", "Home loan vs rent", "Crypto investment in India"
 
-Ready to help with your financial journey! 🚀"""
\ No newline at end of file
+Ready to help with your financial journey! 🚀"""
+
+def get_fallback_response(message, user_context):
+    """Provide comprehensive Indian financial advice when AI is not available"""
+    chat_replies.inc(1, 'fallback')
+    intent = fallback_router.route(message)
+    if intent is None:
+        return default_fallback_response(user_context)
+    return FALLBACK_ANSWERS[intent]
+
+def fallback_events(message, user_context):
+    """Fallback answer as SSE token events, one per line, so clients handle one protocol"""
+    chat_replies.inc(1, 'fallback')
+    intent = fallback_router.route(message.lower())
+    if intent is None:
+        lines = default_fallback_response(user_context).splitlines(keepends=True)
+        return b"".join(sse_event("token", {"text": line}) for line in lines)
+    return FALLBACK_EVENTS[intent]
+
+def fallback_body(message, user_context):
+    """The /api/chat JSON document for a fallback answer
+
+    Matches jsonify's compact output only; in debug mode, or with
+    app.json.compact set to False, jsonify indents and this does not.
+    """
+    chat_replies.inc(1, 'fallback')
+    intent = fallback_router.route(message.lower())
+    encoded = json.dumps(default_fallback_response(user_context)).encode() if intent is None else FALLBACK_JSON[intent]
+    return b'{"cached_prefix_tokens":0,"message":' + encoded + b',"prompt_tokens":0,"status":"success"}\n'
@@ -1,32 +1,100 @@
 from flask import Blueprint, request, jsonify
+from pymongo.errors import BulkWriteError as MongoBulkWriteError
+from config import Config
 from database import get_db
+from storage.base import BulkWriteError
+from utils.cache import invalidate_user_analytics
+import json
+import math
 import uuid
 from datetime import datetime
 
 goals_bp = Blueprint('goals', __name__)
 
-def create_savings_plan(dream_cost, current_savings, timeline_months, monthly_income):
+MILESTONE_INTERVALS = {"monthly": 1, "quarterly": 3, "yearly": 12}
+MILESTONE_FORMATS = ('objects', 'arrays', 'schedule')
+
+def check_timeline(timeline_months):
+    if (not isinstance(timeline_months, int) or isinstance(timeline_months, bool)
+            or not 1 <= timeline_months <= Config.GOAL_MAX_TIMELINE_MONTHS):
+        raise ValueError(f"timeline_months must be an integer from 1 to {Config.GOAL_MAX_TIMELINE_MONTHS}")
+
+def create_savings_plan(dream_cost, current_savings, timeline_months, monthly_income,
+                        granularity='monthly', page=1, page_size=None, milestone_format='objects'):
+    """Savings plan with one page of milestones
+    
+    Milestones fall every 1, 3 or 12 months (granularity) and always end on the
+    final month. "milestone_schedule" describes all of them in closed form,
+    target_amount = start_amount + monthly_saving * month, so only the page the
+    client renders is materialized: as objects, as parallel arrays, or not at
+    all with milestone_format='schedule'.
+    """
+    check_timeline(timeline_months)
+    if granularity not in MILESTONE_INTERVALS:
+        raise ValueError(f"granularity must be one of {', '.join(MILESTONE_INTERVALS)}")
+    if milestone_format not in MILESTONE_FORMATS:
+        raise ValueError(f"format must be one of {', '.join(MILESTONE_FORMATS)}")
+    page_size = Config.MILESTONES_PAGE_SIZE if page_size is None else page_size
+    if page < 1 or not 1 <= page_size <= Config.MILESTONES_PAGE_MAX:
+        raise ValueError(f"page must be at least 1 and page_size from 1 to {Config.MILESTONES_PAGE_MAX}")
+    
     remaining_amount = dream_cost - current_savings
-    monthly_target = remaining_amount / timeline_months if timeline_months > 0 else 0
+    monthly_target = remaining_amount / timeline_months
     
     savings_rate = (monthly_target / monthly_income) * 100 if monthly_income > 0 else 0
     
-    milestones = []
-    for i in range(1, timeline_months + 1):
-        milestone_amount = current_savings + (monthly_target * i)
-        milestones.append({
-            "month": i,
-            "target_amount": milestone_amount,
-            "monthly_saving": monthly_target
-        })
+    interval = MILESTONE_INTERVALS[granularity]
+    count = -(-timeline_months // interval)
+    first = (page - 1) * page_size + 1
+    months = [min(n * interval, timeline_months) for n in range(first, min(first + page_size - 1, count) + 1)]
     
-    return {
+    plan = {
         "monthly_target": monthly_target,
         "savings_rate_percentage": savings_rate,
         "total_months": timeline_months,
-        "milestones": milestones,
+        "milestone_schedule": {
+            "start_amount": current_savings,
+            "monthly_saving": monthly_target,
+            "granularity": granularity,
+            "interval_months": interval,
+            "count": count,
+            "final_month": timeline_months
+        },
+        "milestone_page": {"page": page, "page_size": page_size, "pages": -(-count // page_size)},
         "feasibility": "Easy" if savings_rate < 20 else "Challenging" if savings_rate < 40 else "Very Difficult"
     }
+    if milestone_format == 'objects':
+        plan["milestones"] = [{
+            "month": month,
+            "target_amount": current_savings + (monthly_target * month),
+            "monthly_saving": monthly_target
+        } for month in months]
+    elif milestone_format == 'arrays':
+        plan["milestones"] = {
+            "month": months,
+            "target_amount": [current_savings + (monthly_target * month) for month in months]
+        }
+    return plan
+
+def plan_options():
+    """Milestone shaping from the query string: ?granularity=&page=&page_size=&format="""
+    return {
+        "granularity": request.args.get('granularity', 'monthly'),
+        "page": request.args.get('page', 1, type=int),
+        "page_size": request.args.get('page_size', type=int),
+        "milestone_format": request.args.get('format', 'objects')
+    }
+
+def increment_goal_totals(db, user_id, goals=0, target=0, current=0):
+    """$inc the running goal totals on the user document
+    
+    Users created before the totals existed have no goals_count and are left
+    alone; analytics sums their goal list instead.
+    """
+    db.users.update_one(
+        {"user_id": user_id, "goals_count": {"$exists": True}},
+        {"$inc": {"goals_count": goals, "goals_target_total": target, "goals_current_total": current}}
+    )
 
 @goals_bp.route('/api/goals', methods=['POST'])
 def create_goal():
@@ -34,36 +102,216 @@ def create_goal():
         db = get_db()
         data = request.get_json()
         user_id = data.get('user_id')
+        target, current = data.get('target_amount'), data.get('current_amount', 0)
+        # Checked before anything is written: a NaN would stick in the user's running totals
+        if not is_number(target) or target < 0:
+            raise ValueError("target_amount must be a non-negative number")
+        if not is_number(current) or current < 0:
+            raise ValueError("current_amount must be a non-negative number")
         
         savings_plan = create_savings_plan(
-            data.get('target_amount', 0),
-            data.get('current_amount', 0),
+            target,
+            current,
             data.get('timeline_months', 12),
-            data.get('monthly_income', 0)
+            data.get('monthly_income', 0),
+            **plan_options()
         )
         
         goal_data = {
             "goal_id": str(uuid.uuid4()),
             "user_id": user_id,
             "dream": data.get('dream'),
-            "target_amount": data.get('target_amount'),
-            "current_amount": data.get('current_amount', 0),
-            "timeline_months": data.get('timeline_months'),
+            "target_amount": target,
+            "current_amount": current,
+            "timeline_months": data.get('timeline_months', 12),
+            "monthly_income": data.get('monthly_income', 0),
             "created_at": datetime.utcnow()
         }
         
-        if isinstance(db, dict):
-            # Fallback storage
-            db['goals'].append(goal_data)
-        else:
-            # MongoDB
-            db.goals.insert_one(goal_data)
+        db.goals.insert_one(goal_data)
+        increment_goal_totals(db, user_id, 1, target, current)
+        
+        invalidate_user_analytics(user_id)
         
         return jsonify({
             "goal_id": goal_data['goal_id'],
             "savings_plan": savings_plan,
             "status": "created"
         })
+    except ValueError as e:
+        return jsonify({"error": str(e), "status": "error"}), 400
+    except Exception as e:
+        return jsonify({"error": str(e), "status": "error"}), 500
+
+def is_number(value):
+    """A finite int or float; the JSON parser lets NaN and Infinity through"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+def validate_goal_row(row):
+    """Return (goal document, None) for a valid bulk row, or (None, error message)"""
+    if not isinstance(row, dict):
+        return None, "row must be a JSON object"
+    user_id, dream = row.get('user_id'), row.get('dream')
+    target, current = row.get('target_amount'), row.get('current_amount', 0)
+    timeline = row.get('timeline_months', 12)
+    if not isinstance(user_id, str) or not user_id:
+        return None, "user_id is required"
+    if not isinstance(dream, str) or not dream.strip():
+        return None, "dream is required"
+    if not is_number(target) or target <= 0:
+        return None, "target_amount must be a positive number"
+    if not is_number(current) or current < 0:
+        return None, "current_amount must be a non-negative number"
+    income = row.get('monthly_income', 0)
+    if not is_number(income) or income < 0:
+        return None, "monthly_income must be a non-negative number"
+    try:
+        check_timeline(timeline)
+    except ValueError as e:
+        return None, str(e)
+    return {
+        "goal_id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "dream": dream,
+        "target_amount": target,
+        "current_amount": current,
+        "timeline_months": timeline,
+        "monthly_income": income,
+        "created_at": datetime.utcnow()
+    }, None
+
+class TooManyGoals(ValueError):
+    """A bulk import over GOALS_BULK_MAX_ROWS"""
+
+def parse_ndjson_lines(lines):
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line), None
+        except ValueError as e:
+            yield None, f"invalid JSON: {e}"
+
+def read_goal_rows():
+    """Yield (row, parse error) pairs from a JSON array or an NDJSON request body
+
+    NDJSON is read from the request stream in chunks, so a large import is
+    never held in memory as one document.
+    """
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        pending = b''
+        # 64 KB reads split on newlines; the stream's own line iterator is far slower
+        for chunk in iter(lambda: request.stream.read(65536), b''):
+            lines = (pending + chunk).split(b'\n')
+            pending = lines.pop()
+            yield from parse_ndjson_lines(lines)
+        yield from parse_ndjson_lines([pending])
+        return
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('goals')
+    if not isinstance(data, list):
+        raise ValueError("expected a JSON array of goals or an application/x-ndjson body")
+    if len(data) > Config.GOALS_BULK_MAX_ROWS:
+        raise TooManyGoals(f"{len(data)} goals is over the limit of {Config.GOALS_BULK_MAX_ROWS} per import")
+    for row in data:
+        yield row, None
+
+def write_goal_batch(db, batch, results):
+    """Insert (row index, goal) pairs, record each row's outcome in `results` and return the goals written
+
+    Rows for users that do not exist fail with "user not found" instead of
+    being written as orphan goals; one $in query checks the whole batch.
+    """
+    user_ids = list({goal['user_id'] for _, goal in batch})
+    known = {user['user_id'] for user in db.users.find({"user_id": {"$in": user_ids}}, {"user_id": 1})}
+    for index, goal in batch:
+        if goal['user_id'] not in known:
+            results.append({"index": index, "status": "error", "error": "user not found"})
+    batch = [(index, goal) for index, goal in batch if goal['user_id'] in known]
+    if not batch:
+        return []
+    
+    failed = {}
+    try:
+        db.goals.insert_many([goal for _, goal in batch], ordered=False)
+    except (MongoBulkWriteError, BulkWriteError) as e:
+        # Unordered: every document was attempted and only the failures are reported
+        failed = {error['index']: error.get('errmsg', 'write failed') for error in e.details.get('writeErrors', [])}
+    written = []
+    for position, (index, goal) in enumerate(batch):
+        if position in failed:
+            results.append({"index": index, "status": "error", "error": failed[position]})
+        else:
+            results.append({"index": index, "status": "created", "goal_id": goal['goal_id']})
+            written.append(goal)
+    return written
+
+def apply_goal_totals(db, goals):
+    """One $inc per user for a batch of written goals; returns how many goals there were
+
+    Runs right after each batch, so a later batch failing leaves the totals
+    matching the goals already written.
+    """
+    totals = {}
+    for goal in goals:
+        count, target, current = totals.get(goal['user_id'], (0, 0, 0))
+        totals[goal['user_id']] = (count + 1, target + goal['target_amount'], current + goal['current_amount'])
+    for user_id, (count, target, current) in totals.items():
+        increment_goal_totals(db, user_id, count, target, current)
+        invalidate_user_analytics(user_id)
+    return len(goals)
+
+@goals_bp.route('/api/goals/bulk', methods=['POST'])
+def import_goals():
+    """Create many goals from a JSON array (or {"goals": [...]}) or an NDJSON body
+
+    Rows are validated one by one and written with unordered insert_many in
+    batches of GOALS_BULK_BATCH_SIZE, so one bad row never blocks the others.
+    The response carries a result per row, in input order. A JSON array over
+    GOALS_BULK_MAX_ROWS is rejected whole; an NDJSON stream is read no further
+    than that, its first rows are imported and the response is a 413.
+    """
+    try:
+        db = get_db()
+        results, batch = [], []
+        created = 0
+        truncated = False
+        
+        for index, (row, error) in enumerate(read_goal_rows()):
+            if index >= Config.GOALS_BULK_MAX_ROWS:
+                truncated = True
+                break
+            goal = None
+            if error is None:
+                goal, error = validate_goal_row(row)
+            if error is not None:
+                results.append({"index": index, "status": "error", "error": error})
+                continue
+            batch.append((index, goal))
+            if len(batch) >= Config.GOALS_BULK_BATCH_SIZE:
+                created += apply_goal_totals(db, write_goal_batch(db, batch, results))
+                batch = []
+        if batch:
+            created += apply_goal_totals(db, write_goal_batch(db, batch, results))
+        
+        results.sort(key=lambda result: result['index'])
+        summary = {
+            "status": "completed",
+            "received": len(results),
+            "created": created,
+            "failed": len(results) - created,
+            "results": results
+        }
+        if truncated:
+            summary.update(status="truncated", error=f"only the first {Config.GOALS_BULK_MAX_ROWS} goals were "
+                                                     f"read; split the import to send the rest")
+            return jsonify(summary), 413
+        return jsonify(summary)
+    except TooManyGoals as e:
+        return jsonify({"error": str(e), "status": "error"}), 413
+    except ValueError as e:
+        return jsonify({"error": str(e), "status": "error"}), 400
     except Exception as e:
         return jsonify({"error": str(e), "status": "error"}), 500
 
@@ -73,12 +321,7 @@ def get_user_goals(user_id):
         db = get_db()
         goal_list = []
         
-        if isinstance(db, dict):
-            # Fallback storage
-            goals = [g for g in db['goals'] if g['user_id'] == user_id]
-        else:
-            # MongoDB
-            goals = list(db.goals.find({"user_id": user_id}))
+        goals = db.goals.find({"user_id": user_id})
         
         for goal in goals:
             goal_list.append({
@@ -94,6 +337,109 @@ def get_user_goals(user_id):
     except Exception as e:
         return jsonify({"error": str(e), "status": "error"}), 500
 
+@goals_bp.route('/api/goals/<user_id>/<goal_id>/plan', methods=['GET'])
+def get_goal_plan(user_id, goal_id):
+    """Savings plan of a stored goal, for paging through its milestones"""
+    try:
+        db = get_db()
+        goal = db.goals.find_one({"goal_id": goal_id, "user_id": user_id})
+        if not goal:
+            return jsonify({"error": "Goal not found", "status": "error"}), 404
+        
+        savings_plan = create_savings_plan(
+            goal['target_amount'],
+            goal['current_amount'],
+            goal['timeline_months'],
+            goal.get('monthly_income', 0),
+            **plan_options()
+        )
+        return jsonify({"goal_id": goal_id, "savings_plan": savings_plan})
+    except ValueError as e:
+        return jsonify({"error": str(e), "status": "error"}), 400
+    except Exception as e:
+        return jsonify({"error": str(e), "status": "error"}), 500
+
+@goals_bp.route('/api/goals/<user_id>/<goal_id>/contributions', methods=['POST'])
+def add_contribution(user_id, goal_id):
+    """Record a contribution to a goal, or a withdrawal with a negative amount
+    
+    The entry is appended to the contributions ledger and the goal's
+    current_amount and the user's goals_current_total move with atomic $inc,
+    so no totals are re-summed. Withdrawing more than is saved is rejected.
+    
+    The entry is written first as "pending" and marked "applied" once the goal
+    has moved, so the goal never changes without a ledger record: a rejected
+    change deletes its entry, a failed one is marked "failed", and an entry a
+    crash leaves "pending" is the one to reconcile against the goal.
+    """
+    try:
+        db = get_db()
+        data = request.get_json(silent=True) or {}
+        amount = data.get('amount')
+        if not is_number(amount) or amount == 0:
+            return jsonify({"error": "amount must be a non-zero number", "status": "error"}), 400
+        
+        entry = {
+            "entry_id": str(uuid.uuid4()),
+            "goal_id": goal_id,
+            "user_id": user_id,
+            "amount": amount,
+            "note": data.get('note'),
+            "status": "pending",
+            "created_at": datetime.utcnow()
+        }
+        db.contributions.insert_one(entry)
+        entry_filter = {"entry_id": entry['entry_id']}
+        
+        goal_filter = {"goal_id": goal_id, "user_id": user_id}
+        guard = dict(goal_filter, current_amount={"$gte": -amount}) if amount < 0 else goal_filter
+        try:
+            result = db.goals.update_one(guard, {"$inc": {"current_amount": amount, "contribution_count": 1}})
+        except Exception:
+            db.contributions.update_one(entry_filter, {"$set": {"status": "failed"}})
+            raise
+        if result.matched_count == 0:
+            db.contributions.delete_one(entry_filter)
+            if db.goals.find_one(goal_filter, {"goal_id": 1}) is None:
+                return jsonify({"error": "Goal not found", "status": "error"}), 404
+            return jsonify({"error": "Withdrawal exceeds the saved amount", "status": "error"}), 409
+        
+        db.contributions.update_one(entry_filter, {"$set": {"status": "applied"}})
+        increment_goal_totals(db, user_id, current=amount)
+        
+        invalidate_user_analytics(user_id)
+        
+        goal = db.goals.find_one(goal_filter, {"current_amount": 1, "target_amount": 1, "contribution_count": 1})
+        return jsonify({
+            "entry_id": entry['entry_id'],
+            "current_amount": goal['current_amount'],
+            "contribution_count": goal['contribution_count'],
+            "progress_percentage": (goal['current_amount'] / goal['target_amount']) * 100 if goal['target_amount'] > 0 else 0,
+            "status": "recorded"
+        })
+    except Exception as e:
+        return jsonify({"error": str(e), "status": "error"}), 500
+
+@goals_bp.route('/api/goals/<user_id>/<goal_id>/contributions', methods=['GET'])
+def get_contributions(user_id, goal_id):
+    """A goal's contribution ledger, newest first (?limit=N)"""
+    try:
+        db = get_db()
+        limit = request.args.get('limit', Config.CONTRIBUTIONS_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, Config.CONTRIBUTIONS_PAGE_MAX))
+        
+        entries = db.contributions.find({"goal_id": goal_id, "user_id": user_id}).sort("created_at", -1).limit(limit)
+        
+        return jsonify({"goal_id": goal_id, "contributions": [{
+            "entry_id": entry['entry_id'],
+            "amount": entry['amount'],
+            "note": entry.get('note'),
+            "status": entry.get('status', 'applied'),
+            "created_at": entry['created_at'].isoformat() if isinstance(entry['created_at'], datetime) else entry['created_at']
+        } for entry in entries]})
+    except Exception as e:
+        return jsonify({"error": str(e), "status": "error"}), 500
+
 @goals_bp.route('/api/emergency-fund', methods=['POST'])
 def calculate_emergency_fund():
     try:
@@ -0,0 +1,56 @@
+from flask import Blueprint, Response
+from cleanup_worker import cleanup_worker
+from database import get_db, pool_stats
+from storage.base import LocalDatabase
+from utils.cache import analytics_cache
+from utils.llm_gate import llm_gate
+from utils.metrics import registry
+from utils.response_cache import response_cache
+from routes.chat import sessions
+
+metrics_bp = Blueprint('metrics', __name__)
+
+def cache_gauges():
+    caches = {"analytics": analytics_cache.stats(), "chat_response": response_cache.stats()}
+    for stat, help in (("hit_rate", "Cache hit ratio since start"), ("hits", "Cache hits"),
+                       ("misses", "Cache misses"), ("size", "Cache entries"), ("evictions", "Cache evictions")):
+        yield f"finbuddy_cache_{stat}", help, [({"cache": name}, stats[stat]) for name, stats in caches.items()]
+    yield ("finbuddy_chat_cache_saved_llm_seconds", "LLM seconds saved by chat response cache hits",
+           [({}, caches["chat_response"]["saved_llm_seconds"])])
+
+def chat_gauges():
+    gate = llm_gate.stats()
+    for stat, help in (("active", "LLM calls in progress"), ("queue_depth", "Requests waiting for an LLM slot"),
+                       ("max_queue_depth", "Deepest LLM queue seen"), ("coalesced", "Requests served by another's LLM call"),
+                       ("rejected", "Requests that fell back after the LLM queue budget")):
+        yield f"finbuddy_llm_{stat}", help, [({}, gate[stat])]
+    memory = sessions.stats()
+    yield "finbuddy_chat_sessions", "Chat sessions with stored history", [({}, memory["sessions"])]
+    yield "finbuddy_chat_memory_chars", "Characters of stored chat history", [({}, memory["stored_chars"])]
+
+def database_gauges():
+    db = get_db()
+    if isinstance(db, LocalDatabase):
+        yield ("finbuddy_fallback_store_documents", "Documents per collection in the local fallback store",
+               [({"collection": name}, db[name].count_documents({})) for name in db.list_collection_names()])
+        return
+    pool = pool_stats.stats()
+    for stat, help in (("connections_open", "Open MongoDB connections"), ("connections_in_use", "Checked-out MongoDB connections"),
+                       ("checkouts_waiting", "Threads waiting for a MongoDB connection"),
+                       ("avg_checkout_wait_ms", "Average MongoDB connection checkout wait")):
+        yield f"finbuddy_mongo_pool_{stat}", help, [({}, pool[stat])]
+
+def cleanup_gauges():
+    cleanup = cleanup_worker.stats()
+    yield "finbuddy_cleanup_queued", "Deleted users waiting for background cleanup", [({}, cleanup["queued"])]
+    yield "finbuddy_cleanup_completed", "User cleanups finished by this process", [({}, cleanup["completed"])]
+    yield ("finbuddy_cleanup_documents_deleted", "Documents removed by background user cleanup",
+           [({}, cleanup["documents_deleted"])])
+
+for collector in (cache_gauges, chat_gauges, database_gauges, cleanup_gauges):
+    registry.register_collector(collector)
+
+@metrics_bp.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus text exposition of request, MongoDB, LLM, cache and storage metrics"""
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
@@ -1,33 +1,74 @@
-from flask import Blueprint, request, jsonify
-from database import get_db
+from flask import Blueprint, Response, request, jsonify
+from config import Config
+from pymongo.errors import DuplicateKeyError as MongoDuplicateKeyError
+from cleanup_worker import cleanup_worker, new_tombstone, tombstone_progress
+from database import GOAL_TOTAL_FIELDS, get_db
+from storage.base import DuplicateKeyError
+from utils.cache import invalidate_user_analytics
+import json
 import uuid
 from datetime import datetime
 
 users_bp = Blueprint('users', __name__)
 
+# Only the fields the user listing returns are read from the database
+USER_LIST_PROJECTION = {"_id": 0, "user_id": 1, "age_bracket": 1, "status": 1, "monthly_income_range": 1, "created_at": 1}
+
+def user_summary(user):
+    return {
+        "user_id": user['user_id'],
+        "age_bracket": user['age_bracket'],
+        "status": user['status'],
+        "monthly_income_range": user['monthly_income_range'],
+        "created_at": user['created_at'].isoformat() if isinstance(user['created_at'], datetime) else user['created_at']
+    }
+
+def encode_user(user):
+    return json.dumps(user_summary(user), sort_keys=True, separators=(',', ':'))
+
+def stream_ndjson(users):
+    for user in users:
+        yield encode_user(user) + "\n"
+
+def stream_user_list(users):
+    """Stream {"users": [...]} row by row instead of building the whole list in memory"""
+    yield '{"users":['
+    separator = ''
+    for user in users:
+        yield separator + encode_user(user)
+        separator = ','
+    yield ']}\n'
+
 @users_bp.route('/api/users', methods=['GET'])
 def get_all_users():
+    """List users
+    
+    ?limit=N&after=<user_id> returns one keyset page ordered by user_id together
+    with "next_after" for the following page. ?format=ndjson (or Accept:
+    application/x-ndjson) streams one user per line. Without paging parameters
+    the full list is streamed as the original {"users": [...]} document.
+    """
     try:
         db = get_db()
-        user_list = []
-        
-        if isinstance(db, dict):
-            # Fallback storage
-            users = db['users']
-        else:
-            # MongoDB
-            users = list(db.users.find({}))
-        
-        for user in users:
-            user_list.append({
-                "user_id": user['user_id'],
-                "age_bracket": user['age_bracket'],
-                "status": user['status'],
-                "monthly_income_range": user['monthly_income_range'],
-                "created_at": user['created_at'].isoformat() if isinstance(user['created_at'], datetime) else user['created_at']
-            })
-        
-        return jsonify({"users": user_list})
+        limit = request.args.get('limit', type=int)
+        after = request.args.get('after')
+        ndjson = (request.args.get('format') == 'ndjson'
+                  or request.accept_mimetypes.best == 'application/x-ndjson')
+        
+        users = db.users.find({"user_id": {"$gt": after}} if after else {}, USER_LIST_PROJECTION)
+        paged = limit is not None or after is not None
+        if paged:
+            limit = max(1, min(limit or Config.USERS_PAGE_SIZE, Config.USERS_PAGE_MAX))
+            users = users.sort("user_id", 1).limit(limit)
+        
+        if ndjson:
+            return Response(stream_ndjson(users), mimetype='application/x-ndjson')
+        if not paged:
+            return Response(stream_user_list(users), mimetype='application/json')
+        
+        user_list = [user_summary(user) for user in users]
+        next_after = user_list[-1]['user_id'] if len(user_list) == limit else None
+        return jsonify({"users": user_list, "next_after": next_after})
     except Exception as e:
         return jsonify({"error": str(e), "status": "error"}), 500
 
@@ -36,12 +77,7 @@ def get_user(user_id):
     try:
         db = get_db()
         
-        if isinstance(db, dict):
-            # Fallback storage
-            user = next((u for u in db['users'] if u['user_id'] == user_id), None)
-        else:
-            # MongoDB
-            user = db.users.find_one({"user_id": user_id})
+        user = db.users.find_one({"user_id": user_id})
         
         if not user:
             return jsonify({"error": "User not found", "status": "error"}), 404
@@ -69,16 +105,13 @@ def create_user():
             "status": data.get('status'),
             "monthly_income_range": data.get('monthly_income_range'),
             "name": data.get('name', f"User_{user_id[:8]}"),
+            # Goal totals start at zero and are kept current with $inc
+            **{field: 0 for field in GOAL_TOTAL_FIELDS},
             "created_at": datetime.utcnow(),
             "updated_at": datetime.utcnow()
         }
         
-        if isinstance(db, dict):
-            # Fallback storage
-            db['users'].append(user_data)
-        else:
-            # MongoDB
-            db.users.insert_one(user_data)
+        db.users.insert_one(user_data)
         
         # Remove MongoDB ObjectId for JSON serialization
         user_response = {k: v for k, v in user_data.items() if k != '_id'}
@@ -103,57 +136,61 @@ def update_user(user_id):
         # Remove None values
         update_data = {k: v for k, v in update_data.items() if v is not None}
         
-        if isinstance(db, dict):
-            # Fallback storage
-            for i, user in enumerate(db['users']):
-                if user['user_id'] == user_id:
-                    db['users'][i].update(update_data)
-                    return jsonify({"status": "updated", "user": db['users'][i]})
+        result = db.users.update_one(
+            {"user_id": user_id}, 
+            {"$set": update_data}
+        )
+        if result.matched_count == 0:
             return jsonify({"error": "User not found", "status": "error"}), 404
-        else:
-            # MongoDB
-            result = db.users.update_one(
-                {"user_id": user_id}, 
-                {"$set": update_data}
-            )
-            if result.matched_count == 0:
-                return jsonify({"error": "User not found", "status": "error"}), 404
-            
-            updated_user = db.users.find_one({"user_id": user_id})
-            # Remove MongoDB ObjectId for JSON serialization
-            user_response = {k: v for k, v in updated_user.items() if k != '_id'} if updated_user else None
-            return jsonify({"status": "updated", "user": user_response})
-            
+        
+        invalidate_user_analytics(user_id)
+        updated_user = db.users.find_one({"user_id": user_id})
+        # Remove MongoDB ObjectId for JSON serialization
+        user_response = {k: v for k, v in updated_user.items() if k != '_id'} if updated_user else None
+        return jsonify({"status": "updated", "user": user_response})
+        
     except Exception as e:
         return jsonify({"error": str(e), "status": "error"}), 500
 
 @users_bp.route('/api/user/<user_id>', methods=['DELETE'])
 def delete_user(user_id):
+    """Delete the profile now; goals, contributions and learning progress go in the background
+    
+    A tombstone in deleted_users tracks the cleanup, see cleanup_worker.py and
+    GET /api/user/<user_id>/deletion. It is written before the profile is
+    removed, so a crash in between leaves a tombstone the worker finishes; the
+    unique index on its user_id makes a retried request safe.
+    """
     try:
         db = get_db()
         
-        if isinstance(db, dict):
-            # Fallback storage
-            original_count = len(db['users'])
-            db['users'] = [u for u in db['users'] if u['user_id'] != user_id]
-            
-            if len(db['users']) == original_count:
-                return jsonify({"error": "User not found", "status": "error"}), 404
-            
-            # Also delete user's goals and learning progress
-            db['goals'] = [g for g in db['goals'] if g['user_id'] != user_id]
-            db['learning_progress'] = [l for l in db['learning_progress'] if l['user_id'] != user_id]
-            
-        else:
-            # MongoDB
-            result = db.users.delete_one({"user_id": user_id})
-            if result.deleted_count == 0:
-                return jsonify({"error": "User not found", "status": "error"}), 404
-            
-            # Also delete user's related data
-            db.goals.delete_many({"user_id": user_id})
-            db.learning_progress.delete_many({"user_id": user_id})
-        
-        return jsonify({"status": "deleted", "user_id": user_id})
+        if db.users.find_one({"user_id": user_id}, {"user_id": 1}) is None:
+            return jsonify({"error": "User not found", "status": "error"}), 404
+        
+        try:
+            db.deleted_users.insert_one(new_tombstone(user_id))
+        except (DuplicateKeyError, MongoDuplicateKeyError):
+            pass  # a retry of an earlier, interrupted delete
+        
+        result = db.users.delete_one({"user_id": user_id})
+        if result.deleted_count == 0:
+            return jsonify({"error": "User not found", "status": "error"}), 404
+        
+        cleanup_worker.enqueue(user_id)
+        
+        invalidate_user_analytics(user_id)
+        
+        return jsonify({"status": "deleted", "user_id": user_id, "cleanup": f"/api/user/{user_id}/deletion"}), 202
+    except Exception as e:
+        return jsonify({"error": str(e), "status": "error"}), 500
+
+@users_bp.route('/api/user/<user_id>/deletion', methods=['GET'])
+def get_deletion_progress(user_id):
+    try:
+        db = get_db()
+        tombstone = db.deleted_users.find_one({"user_id": user_id})
+        if not tombstone:
+            return jsonify({"error": "No deletion found for this user", "status": "error"}), 404
+        return jsonify(tombstone_progress(tombstone))
     except Exception as e:
         return jsonify({"error": str(e), "status": "error"}), 500
\ No newline at end of file
@@ -4,6 +4,7 @@ FinBuddy Application Launcher
 This script handles both development and production modes
 """
 
+import importlib.util
 import os
 import subprocess
 import sys
@@ -36,17 +37,76 @@ def build_frontend():
 
 def check_dependencies():
     """Check if required dependencies are installed"""
-    try:
-        import flask
-        import pymongo
-        import openai
-        import langchain
-        print("✅ All Python dependencies are available")
-        return True
-    except ImportError as e:
-        print(f"❌ Missing dependency: {e}")
+    # find_spec only locates the packages; the AI stack is imported on the first chat request
+    missing = [name for name in ('flask', 'pymongo', 'openai', 'langchain_openai')
+               if importlib.util.find_spec(name) is None]
+    if missing:
+        print(f"❌ Missing dependency: {', '.join(missing)}")
         print("Run: pip install -r requirements.txt")
         return False
+    print("✅ All Python dependencies are available")
+    return True
+
+def init_worker(server, worker):
+    """gunicorn post_fork hook: each worker opens its own database client"""
+    import database
+    from cleanup_worker import cleanup_worker
+    database.pool_stats.reset()
+    database.init_db()
+    cleanup_worker.ensure_running()
+
+def release_parent_resources(server):
+    """gunicorn when_ready hook: the preloading master must not hand its MongoClient to workers"""
+    import database
+    database.close_db()
+
+def serve_production(app, port):
+    """Serve with gunicorn (pre-fork workers x threads), or waitress where gunicorn is unavailable"""
+    from config import Config
+    
+    server = Config.WEB_SERVER
+    if server == 'auto':
+        server = 'gunicorn' if importlib.util.find_spec('gunicorn') and os.name != 'nt' else 'waitress'
+    
+    if Config.FALLBACK_STORE == 'memory' and Config.WEB_WORKERS > 1 and server == 'gunicorn':
+        print("⚠️  Each worker gets its own in-memory fallback store - set FALLBACK_STORE=sqlite to share data")
+    
+    if server == 'waitress':
+        from waitress import serve
+        from cleanup_worker import cleanup_worker
+        cleanup_worker.ensure_running()
+        threads = Config.WEB_WORKERS * Config.WEB_THREADS
+        print(f"🌐 Starting waitress with {threads} threads")
+        serve(app, host='0.0.0.0', port=port, threads=threads)
+        return
+    
+    from gunicorn.app.base import BaseApplication
+    
+    class ProductionServer(BaseApplication):
+        def load_config(self):
+            options = {
+                'bind': f"0.0.0.0:{port}",
+                'workers': Config.WEB_WORKERS,
+                'threads': Config.WEB_THREADS,
+                'worker_class': 'gthread',
+                # The app is built once in the master and shared copy-on-write by the workers
+                'preload_app': True,
+                'timeout': Config.WEB_TIMEOUT,
+                'graceful_timeout': Config.WEB_GRACEFUL_TIMEOUT,
+                'max_requests': Config.WEB_MAX_REQUESTS,
+                'max_requests_jitter': Config.WEB_MAX_REQUESTS // 10,
+                'when_ready': release_parent_resources,
+                'post_fork': init_worker
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+        
+        def load(self):
+            return app
+    
+    print(f"🌐 Starting gunicorn with {Config.WEB_WORKERS} workers x {Config.WEB_THREADS} threads "
+          f"(kill -HUP the master for a graceful restart)")
+    ProductionServer().run()
 
 def main():
     """Main function to run the application"""
@@ -66,18 +126,24 @@ def main():
     
     # Import and run the Flask app
     try:
-        from app import app, init_db
-        
         print("🔧 Initializing database...")
-        init_db()
+        from app import app
+        
+        port = int(os.getenv('PORT', 5000))
+        if mode == 'production':
+            serve_production(app, port)
+            return
+        
+        # Resume user cleanups left unfinished by the previous run
+        from cleanup_worker import cleanup_worker
+        cleanup_worker.ensure_running()
         
         print("🌐 Starting Flask server...")
         print("📊 Dashboard available at: http://localhost:5000")
         print("🔌 API endpoints available at: http://localhost:5000/api/")
         print("\n💡 To stop the server, press Ctrl+C")
         
-        # Run the app
-        port = int(os.getenv('PORT', 5000))
+        # Run the development server
         debug = mode == 'development'
         
         app.run(
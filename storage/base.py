@@ -0,0 +1,149 @@
+"""Shared pieces of the local (non-MongoDB) storage backends
+
+The backends mimic the subset of the pymongo API the routes use, so route code
+can talk to `get_db()` the same way whichever backend is active.
+"""
+
+# Values the backends can match through an index (or, on SQLite, in SQL)
+SCALAR_TYPES = (str, int, float, bool)
+
+class DuplicateKeyError(Exception):
+    """Raised when an insert or update violates a unique index"""
+
+class BulkWriteError(DuplicateKeyError):
+    """Raised by insert_many when documents violate a unique index
+
+    `details` is shaped like pymongo's BulkWriteError.details: "writeErrors"
+    lists {"index", "code", "errmsg"} per rejected document and "nInserted"
+    counts the documents written. With ordered=True the first error stops the
+    insert; with ordered=False every document is attempted.
+    """
+
+    def __init__(self, write_errors, inserted):
+        super().__init__(f"{len(write_errors)} documents violated a unique index")
+        self.details = {"writeErrors": write_errors, "nInserted": inserted}
+
+def write_error(index, error):
+    return {"index": index, "code": 11000, "errmsg": str(error)}
+
+class InsertOneResult:
+    def __init__(self, inserted_id):
+        self.inserted_id = inserted_id
+
+class InsertManyResult:
+    def __init__(self, inserted_ids):
+        self.inserted_ids = inserted_ids
+
+class UpdateResult:
+    def __init__(self, matched_count, modified_count):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+
+class DeleteResult:
+    def __init__(self, deleted_count):
+        self.deleted_count = deleted_count
+
+def _compare(value, operator, operand):
+    if operator == '$eq':
+        return value == operand
+    if operator == '$ne':
+        return value != operand
+    if operator == '$in':
+        return value in operand
+    if operator == '$nin':
+        return value not in operand
+    if operator == '$exists':
+        return (value is not None) == bool(operand)
+    if value is None:
+        return False
+    if operator == '$gt':
+        return value > operand
+    if operator == '$gte':
+        return value >= operand
+    if operator == '$lt':
+        return value < operand
+    if operator == '$lte':
+        return value <= operand
+    raise ValueError(f"Unsupported query operator: {operator}")
+
+def matches(doc, query):
+    """Evaluate a pymongo-style filter (equality and comparison operators) against a document"""
+    for field, condition in query.items():
+        value = doc.get(field)
+        if isinstance(condition, dict) and condition and all(k.startswith('$') for k in condition):
+            if not all(_compare(value, op, operand) for op, operand in condition.items()):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+def project(doc, projection):
+    """Return a copy of `doc` shaped by a pymongo-style inclusion or exclusion projection"""
+    if not projection:
+        return dict(doc)
+    included = [field for field, flag in projection.items() if flag and field != '_id']
+    if included:
+        return {field: doc[field] for field in included if field in doc}
+    return {field: value for field, value in doc.items() if projection.get(field, 1)}
+
+def apply_update(doc, update):
+    """Apply $set / $inc operators to a document in place"""
+    for operator, fields in update.items():
+        if operator == '$set':
+            doc.update(fields)
+        elif operator == '$inc':
+            for field, amount in fields.items():
+                doc[field] = doc.get(field, 0) + amount
+        else:
+            raise ValueError(f"Unsupported update operator: {operator}")
+
+class LocalCursor:
+    """Lazy result of find(); supports the sort()/limit() chaining the routes use
+    
+    Only single-key sorts are supported. Documents are produced one at a time
+    while iterating, so streaming a large collection never holds all of it.
+    """
+
+    def __init__(self, collection, filter=None, projection=None):
+        self._collection = collection
+        self._filter = filter or {}
+        self._projection = projection
+        self._sort = None
+        self._limit = None
+
+    def sort(self, key, direction=1):
+        if isinstance(key, (list, tuple)):
+            key, direction = key[0]
+        self._sort = (key, direction)
+        return self
+
+    def limit(self, count):
+        self._limit = count or None
+        return self
+
+    def __iter__(self):
+        return self._collection._iterate(self._filter, self._projection, self._sort, self._limit)
+
+class LocalDatabase:
+    """Database facade handing out collections by attribute or item access, like pymongo"""
+
+    collection_class = None
+
+    def __init__(self):
+        self._collections = {}
+
+    def get_collection(self, name):
+        if name not in self._collections:
+            self._collections[name] = self.collection_class(self, name)
+        return self._collections[name]
+
+    def __getitem__(self, name):
+        return self.get_collection(name)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self.get_collection(name)
+
+    def list_collection_names(self):
+        return list(self._collections)
@@ -0,0 +1,224 @@
+"""In-process storage used when MongoDB is unavailable
+
+Documents live in a dict keyed by an internal sequence number. Every index is a
+hash map from field value to sequence numbers, so lookups, updates and deletes
+by an indexed field are O(1) instead of scanning the whole collection.
+"""
+
+import bisect
+import itertools
+import threading
+from storage.base import (
+    BulkWriteError, DuplicateKeyError, write_error, InsertOneResult, InsertManyResult, UpdateResult, DeleteResult,
+    LocalCursor, LocalDatabase, SCALAR_TYPES, matches, project, apply_update
+)
+
+class MemoryCollection:
+    def __init__(self, database, name):
+        self.database = database
+        self.name = name
+        self._docs = {}           # seq -> document
+        self._unique = {}         # field -> {value: seq}
+        self._indexes = {}        # field -> {value: {seq: None}} (dicts keep insertion order)
+        self._sorted_keys = {}    # field -> sorted unique-index values, built on first keyset scan, then kept current
+        self._sequence = itertools.count(1)
+        self._lock = threading.RLock()
+
+    def create_index(self, field, unique=False):
+        with self._lock:
+            if field in self._unique or field in self._indexes:
+                return field
+            if unique:
+                index = {}
+                for seq, doc in self._docs.items():
+                    value = doc.get(field)
+                    if value in index:
+                        raise DuplicateKeyError(f"{self.name}.{field} duplicate value {value!r}")
+                    index[value] = seq
+                self._unique[field] = index
+            else:
+                index = {}
+                for seq, doc in self._docs.items():
+                    index.setdefault(doc.get(field), {})[seq] = None
+                self._indexes[field] = index
+            return field
+
+    # Index maintenance
+
+    def _check_unique(self, doc, seq=None):
+        for field, index in self._unique.items():
+            owner = index.get(doc.get(field))
+            if owner is not None and owner != seq:
+                raise DuplicateKeyError(f"{self.name}.{field} duplicate value {doc.get(field)!r}")
+
+    def _index(self, seq, doc):
+        for field, keys in self._sorted_keys.items():
+            if doc.get(field) is not None:
+                bisect.insort(keys, doc.get(field))
+        for field, index in self._unique.items():
+            index[doc.get(field)] = seq
+        for field, index in self._indexes.items():
+            index.setdefault(doc.get(field), {})[seq] = None
+
+    def _unindex(self, seq, doc):
+        for field, keys in self._sorted_keys.items():
+            value = doc.get(field)
+            if value is not None:
+                position = bisect.bisect_left(keys, value)
+                if position < len(keys) and keys[position] == value:
+                    del keys[position]
+        for field, index in self._unique.items():
+            index.pop(doc.get(field), None)
+        for field, index in self._indexes.items():
+            bucket = index.get(doc.get(field))
+            if bucket is not None:
+                bucket.pop(seq, None)
+                if not bucket:
+                    del index[doc.get(field)]
+
+    def _candidates(self, query):
+        """Sequence numbers that may match `query`, narrowed by an index when possible"""
+        for field, condition in query.items():
+            if isinstance(condition, dict):
+                values = condition.get('$in') if len(condition) == 1 else None
+                if isinstance(values, (list, tuple)) and all(isinstance(v, SCALAR_TYPES) for v in values):
+                    if field in self._unique:
+                        return sorted(seq for seq in map(self._unique[field].get, values) if seq is not None)
+                    if field in self._indexes:
+                        return sorted({seq for value in values for seq in self._indexes[field].get(value, ())})
+                continue
+            if field in self._unique:
+                seq = self._unique[field].get(condition)
+                return [] if seq is None else [seq]
+            if field in self._indexes:
+                return list(self._indexes[field].get(condition, ()))
+        return list(self._docs)
+
+    def _matching(self, query, limit=None):
+        query = query or {}
+        found = []
+        for seq in self._candidates(query):
+            doc = self._docs[seq]
+            if matches(doc, query):
+                found.append(seq)
+                if limit is not None and len(found) >= limit:
+                    break
+        return found
+
+    def _ordered(self, query, sort, limit):
+        """Sequence numbers matching `query` in `sort` order, at most `limit` of them"""
+        if sort is None:
+            return self._matching(query, limit)
+        
+        field, direction = sort
+        if field not in self._unique:
+            found = self._matching(query)
+            found.sort(key=lambda seq: (self._docs[seq].get(field) is not None, self._docs[seq].get(field)),
+                       reverse=direction < 0)
+            return found[:limit] if limit is not None else found
+        
+        # Keyset scan over the unique index: bisect to the range bound, then walk in order
+        keys = self._sorted_keys.get(field)
+        if keys is None:
+            keys = self._sorted_keys[field] = sorted(v for v in self._unique[field] if v is not None)
+        low, high = 0, len(keys)
+        condition = query.get(field)
+        if isinstance(condition, dict):
+            if '$gt' in condition:
+                low = max(low, bisect.bisect_right(keys, condition['$gt']))
+            if '$gte' in condition:
+                low = max(low, bisect.bisect_left(keys, condition['$gte']))
+            if '$lt' in condition:
+                high = min(high, bisect.bisect_left(keys, condition['$lt']))
+            if '$lte' in condition:
+                high = min(high, bisect.bisect_right(keys, condition['$lte']))
+        
+        positions = range(low, high) if direction >= 0 else range(high - 1, low - 1, -1)
+        found = []
+        for position in positions:
+            seq = self._unique[field][keys[position]]
+            if matches(self._docs[seq], query):
+                found.append(seq)
+                if limit is not None and len(found) >= limit:
+                    break
+        return found
+
+    def _iterate(self, query, projection, sort, limit):
+        with self._lock:
+            found = self._ordered(query, sort, limit)
+        # Documents are replaced, never mutated, on update, so copying outside the lock is safe
+        for seq in found:
+            doc = self._docs.get(seq)
+            if doc is not None:
+                yield project(doc, projection)
+
+    # pymongo-compatible API
+
+    def insert_one(self, document):
+        with self._lock:
+            doc = dict(document)
+            self._check_unique(doc)
+            seq = next(self._sequence)
+            self._docs[seq] = doc
+            self._index(seq, doc)
+            return InsertOneResult(seq)
+
+    def insert_many(self, documents, ordered=True):
+        with self._lock:
+            inserted, errors = [], []
+            for index, document in enumerate(documents):
+                try:
+                    inserted.append(self.insert_one(document).inserted_id)
+                except DuplicateKeyError as e:
+                    errors.append(write_error(index, e))
+                    if ordered:
+                        break
+            if errors:
+                raise BulkWriteError(errors, len(inserted))
+            return InsertManyResult(inserted)
+
+    def find(self, filter=None, projection=None):
+        return LocalCursor(self, filter, projection)
+
+    def find_one(self, filter=None, projection=None):
+        with self._lock:
+            found = self._matching(filter, limit=1)
+            return project(self._docs[found[0]], projection) if found else None
+
+    def count_documents(self, filter=None):
+        with self._lock:
+            if not filter:
+                return len(self._docs)
+            return len(self._matching(filter))
+
+    def update_one(self, filter, update):
+        with self._lock:
+            found = self._matching(filter, limit=1)
+            if not found:
+                return UpdateResult(0, 0)
+            seq = found[0]
+            current = self._docs[seq]
+            updated = dict(current)
+            apply_update(updated, update)
+            self._check_unique(updated, seq)
+            self._unindex(seq, current)
+            self._docs[seq] = updated
+            self._index(seq, updated)
+            return UpdateResult(1, int(updated != current))
+
+    def delete_one(self, filter):
+        with self._lock:
+            found = self._matching(filter, limit=1)
+            for seq in found:
+                self._unindex(seq, self._docs.pop(seq))
+            return DeleteResult(len(found))
+
+    def delete_many(self, filter):
+        with self._lock:
+            found = self._matching(filter)
+            for seq in found:
+                self._unindex(seq, self._docs.pop(seq))
+            return DeleteResult(len(found))
+
+class MemoryDatabase(LocalDatabase):
+    collection_class = MemoryCollection
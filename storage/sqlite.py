@@ -0,0 +1,273 @@
+"""Durable local storage on SQLite in WAL mode
+
+Each collection is a table of JSON documents with expression indexes on the
+indexed fields. WAL lets any number of worker processes read while one writes,
+and committed writes survive a crash or restart. Equality filters are pushed
+down to SQL along with $in lists and range operators; any remaining operators are
+evaluated on the decoded documents.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from storage.base import (
+    BulkWriteError, DuplicateKeyError, write_error, InsertOneResult, InsertManyResult, UpdateResult, DeleteResult,
+    LocalCursor, LocalDatabase, SCALAR_TYPES, matches, project, apply_update
+)
+
+FIELD_PATTERN = re.compile(r'^\w+$')
+SQL_OPERATORS = {'$gt': '>', '$gte': '>=', '$lt': '<', '$lte': '<='}
+
+def _encode_default(value):
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _decode_hook(obj):
+    if len(obj) == 1 and "$date" in obj:
+        return datetime.fromisoformat(obj["$date"])
+    return obj
+
+def encode(doc):
+    return json.dumps(doc, default=_encode_default, separators=(',', ':'))
+
+def decode(text):
+    return json.loads(text, object_hook=_decode_hook)
+
+def _field_expr(field):
+    if not FIELD_PATTERN.match(field):
+        raise ValueError(f"Unsupported field name: {field}")
+    return f"json_extract(doc, '$.{field}')"
+
+class SQLiteCollection:
+    def __init__(self, database, name):
+        if not FIELD_PATTERN.match(name):
+            raise ValueError(f"Unsupported collection name: {name}")
+        self.database = database
+        self.name = name
+        self.database.execute(
+            f'CREATE TABLE IF NOT EXISTS "{name}" (id INTEGER PRIMARY KEY AUTOINCREMENT, doc TEXT NOT NULL)'
+        )
+
+    def create_index(self, field, unique=False):
+        kind = "UNIQUE INDEX" if unique else "INDEX"
+        try:
+            self.database.execute(
+                f'CREATE {kind} IF NOT EXISTS "ix_{self.name}_{field}" ON "{self.name}" ({_field_expr(field)})'
+            )
+        except sqlite3.IntegrityError as e:
+            raise DuplicateKeyError(str(e))
+        return field
+
+    def _where(self, query):
+        """Split a filter into a SQL WHERE clause (equalities, $in, range operators) and a residual filter"""
+        clauses, params, residual = [], [], {}
+        for field, condition in (query or {}).items():
+            if not FIELD_PATTERN.match(field):
+                residual[field] = condition
+            elif isinstance(condition, SCALAR_TYPES):
+                clauses.append(f"{_field_expr(field)} = ?")
+                params.append(condition)
+            elif (isinstance(condition, dict) and list(condition) == ['$in'] and isinstance(condition['$in'], (list, tuple))
+                  and all(isinstance(v, SCALAR_TYPES) for v in condition['$in'])):
+                values = condition['$in']
+                clauses.append(f"{_field_expr(field)} IN ({', '.join('?' * len(values))})" if values else "0")
+                params.extend(values)
+            elif (isinstance(condition, dict) and condition
+                  and all(op in SQL_OPERATORS and isinstance(v, SCALAR_TYPES) for op, v in condition.items())):
+                for op, operand in condition.items():
+                    clauses.append(f"{_field_expr(field)} {SQL_OPERATORS[op]} ?")
+                    params.append(operand)
+            else:
+                residual[field] = condition
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params, residual
+
+    def _select(self, query, limit=None, connection=None):
+        """(id, document) pairs matching `query`, in insertion order"""
+        where, params, residual = self._where(query)
+        sql = f'SELECT id, doc FROM "{self.name}"{where} ORDER BY id'
+        if limit is not None and not residual:
+            sql += f" LIMIT {int(limit)}"
+        connection = connection or self.database.connection()
+        found = []
+        for row_id, text in connection.execute(sql, params).fetchall():
+            doc = decode(text)
+            if residual and not matches(doc, residual):
+                continue
+            found.append((row_id, doc))
+            if limit is not None and len(found) >= limit:
+                break
+        return found
+
+    def _iterate(self, query, projection, sort, limit, chunk_size=500):
+        """Stream matching documents straight off a SQLite cursor, `chunk_size` rows at a time"""
+        where, params, residual = self._where(query)
+        order = "id"
+        if sort is not None:
+            field, direction = sort
+            order = f"{_field_expr(field)} {'DESC' if direction < 0 else 'ASC'}, id"
+        sql = f'SELECT doc FROM "{self.name}"{where} ORDER BY {order}'
+        if limit is not None and not residual:
+            sql += f" LIMIT {int(limit)}"
+        
+        cursor = self.database.connection().execute(sql, params)
+        produced = 0
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            for (text,) in rows:
+                doc = decode(text)
+                if residual and not matches(doc, residual):
+                    continue
+                yield project(doc, projection)
+                produced += 1
+                if limit is not None and produced >= limit:
+                    return
+
+    # pymongo-compatible API
+
+    def insert_one(self, document):
+        try:
+            with self.database.transaction() as connection:
+                cursor = connection.execute(f'INSERT INTO "{self.name}" (doc) VALUES (?)', (encode(document),))
+                return InsertOneResult(cursor.lastrowid)
+        except sqlite3.IntegrityError as e:
+            raise DuplicateKeyError(str(e))
+
+    def insert_many(self, documents, ordered=True, batch_size=1000):
+        """Bulk insert, committing one transaction per `batch_size` documents"""
+        inserted, errors = [], []
+        batch = []
+        for document in documents:
+            batch.append((encode(document),))
+            if len(batch) >= batch_size:
+                inserted.extend(self._insert_batch(batch, ordered, len(inserted) + len(errors), errors))
+                batch = []
+                if ordered and errors:
+                    break
+        if batch and not (ordered and errors):
+            inserted.extend(self._insert_batch(batch, ordered, len(inserted) + len(errors), errors))
+        if errors:
+            raise BulkWriteError(errors, len(inserted))
+        return InsertManyResult(inserted)
+
+    def _insert_batch(self, rows, ordered, offset, errors):
+        """Insert one batch; a unique-index conflict redoes it row by row, appending to `errors`"""
+        sql = f'INSERT INTO "{self.name}" (doc) VALUES (?)'
+        try:
+            with self.database.transaction() as connection:
+                connection.executemany(sql, rows)
+                # The write lock is held, so the batch got consecutive AUTOINCREMENT ids
+                last = connection.execute("SELECT last_insert_rowid()").fetchone()[0]
+                return list(range(last - len(rows) + 1, last + 1))
+        except sqlite3.IntegrityError:
+            pass
+        inserted = []
+        with self.database.transaction() as connection:
+            for position, row in enumerate(rows):
+                try:
+                    inserted.append(connection.execute(sql, row).lastrowid)
+                except sqlite3.IntegrityError as e:
+                    errors.append(write_error(offset + position, e))
+                    if ordered:
+                        break
+        return inserted
+
+    def find(self, filter=None, projection=None):
+        return LocalCursor(self, filter, projection)
+
+    def find_one(self, filter=None, projection=None):
+        for _, doc in self._select(filter, limit=1):
+            return project(doc, projection)
+        return None
+
+    def count_documents(self, filter=None):
+        where, params, residual = self._where(filter)
+        if residual:
+            return len(self._select(filter))
+        return self.database.connection().execute(f'SELECT COUNT(*) FROM "{self.name}"{where}', params).fetchone()[0]
+
+    def update_one(self, filter, update):
+        try:
+            with self.database.transaction() as connection:
+                for row_id, doc in self._select(filter, limit=1, connection=connection):
+                    updated = dict(doc)
+                    apply_update(updated, update)
+                    if updated == doc:
+                        return UpdateResult(1, 0)
+                    connection.execute(f'UPDATE "{self.name}" SET doc = ? WHERE id = ?', (encode(updated), row_id))
+                    return UpdateResult(1, 1)
+                return UpdateResult(0, 0)
+        except sqlite3.IntegrityError as e:
+            raise DuplicateKeyError(str(e))
+
+    def delete_one(self, filter):
+        with self.database.transaction() as connection:
+            for row_id, _ in self._select(filter, limit=1, connection=connection):
+                connection.execute(f'DELETE FROM "{self.name}" WHERE id = ?', (row_id,))
+                return DeleteResult(1)
+            return DeleteResult(0)
+
+    def delete_many(self, filter):
+        where, params, residual = self._where(filter)
+        with self.database.transaction() as connection:
+            if not residual:
+                return DeleteResult(connection.execute(f'DELETE FROM "{self.name}"{where}', params).rowcount)
+            ids = [(row_id,) for row_id, _ in self._select(filter, connection=connection)]
+            connection.executemany(f'DELETE FROM "{self.name}" WHERE id = ?', ids)
+            return DeleteResult(len(ids))
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK on this thread's connection"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+        return self.connection
+
+    def __exit__(self, exc_type, exc, tb):
+        self.connection.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+class SQLiteDatabase(LocalDatabase):
+    collection_class = SQLiteCollection
+
+    def __init__(self, path, busy_timeout=30):
+        super().__init__()
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self.connection()
+
+    def connection(self):
+        """Per-thread connection, reopened after fork so processes never share one"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None,
+                                         check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def execute(self, sql, params=()):
+        return self.connection().execute(sql, params)
+
+    def transaction(self):
+        return _Transaction(self.connection())
+
+    def list_collection_names(self):
+        rows = self.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")
+        return [name for (name,) in rows]
+
+    def checkpoint(self):
+        """Fold the WAL back into the main database file"""
+        self.execute("PRAGMA wal_checkpoint(TRUNCATE)")
@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+from config import Config
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after `ttl` seconds
+
+    Keys are tuples whose first element is the owning group (the user_id), so
+    every entry of one user can be dropped in one call when their data changes.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._groups = {}              # group -> set of keys
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._groups.setdefault(key[0], set()).add(key)
+
+            while len(self._entries) > self.maxsize:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+        return value
+
+    def invalidate(self, group):
+        """Drop every entry belonging to `group`; returns how many were removed"""
+        with self._lock:
+            keys = self._groups.pop(group, set())
+            for key in keys:
+                self._entries.pop(key, None)
+            return len(keys)
+
+    def items(self, group):
+        """Unexpired (key, value) pairs of `group`, without touching LRU order or counters"""
+        with self._lock:
+            now = time.monotonic()
+            return [(key, self._entries[key][1]) for key in self._groups.get(group, ())
+                    if self._entries[key][0] > now]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._groups.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def _remove(self, key):
+        self._entries.pop(key, None)
+        group = self._groups.get(key[0])
+        if group is not None:
+            group.discard(key)
+            if not group:
+                del self._groups[key[0]]
+
+# Serialized analytics responses keyed by (user_id, endpoint, period, type)
+analytics_cache = TTLCache(maxsize=Config.ANALYTICS_CACHE_SIZE, ttl=Config.ANALYTICS_CACHE_TTL)
+
+def invalidate_user_analytics(user_id):
+    """Forget cached analytics for a user after their profile or goals change"""
+    return analytics_cache.invalidate(user_id)
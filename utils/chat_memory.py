@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import OrderedDict, deque
+
+class ChatSessionStore:
+    """Bounded conversation history per chat session
+
+    Each session keeps only its last `max_turns` exchanges. Sessions idle for
+    longer than `idle_seconds` are dropped, and the least recently used ones
+    are evicted whenever there are more than `max_sessions` or the stored
+    text exceeds `max_total_chars`. With `max_turns` of 0 nothing is stored.
+    """
+
+    def __init__(self, max_turns=4, max_sessions=1000, idle_seconds=1800, max_total_chars=2_000_000):
+        self.max_turns = max_turns
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self.max_total_chars = max_total_chars
+        self.evictions = 0
+        self._sessions = OrderedDict()  # session_id -> [last_used, deque of (question, answer), chars]
+        self._total_chars = 0
+        self._lock = threading.Lock()
+
+    def history(self, session_id):
+        """Recent (question, answer) turns of a session, oldest first"""
+        with self._lock:
+            self._expire(time.monotonic())
+            session = self._sessions.get(session_id)
+            if session is None:
+                return []
+            session[0] = time.monotonic()
+            self._sessions.move_to_end(session_id)
+            return list(session[1])
+
+    def append(self, session_id, question, answer):
+        if self.max_turns <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = [now, deque(), 0]
+            session[0] = now
+            self._sessions.move_to_end(session_id)
+
+            turns = session[1]
+            if len(turns) >= self.max_turns:
+                old_question, old_answer = turns.popleft()
+                self._resize(session, -(len(old_question) + len(old_answer)))
+            turns.append((question, answer))
+            self._resize(session, len(question) + len(answer))
+
+            self._expire(now)
+            while self._sessions and (len(self._sessions) > self.max_sessions
+                                      or self._total_chars > self.max_total_chars):
+                self._evict(next(iter(self._sessions)))
+
+    def clear(self, session_id=None):
+        with self._lock:
+            if session_id is None:
+                self._sessions.clear()
+                self._total_chars = 0
+            elif session_id in self._sessions:
+                self._total_chars -= self._sessions.pop(session_id)[2]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "stored_chars": self._total_chars,
+                "max_turns": self.max_turns,
+                "max_sessions": self.max_sessions,
+                "max_total_chars": self.max_total_chars,
+                "evictions": self.evictions
+            }
+
+    def _resize(self, session, delta):
+        session[2] += delta
+        self._total_chars += delta
+
+    def _evict(self, session_id):
+        self._total_chars -= self._sessions.pop(session_id)[2]
+        self.evictions += 1
+
+    def _expire(self, now):
+        # Sessions are ordered by last use, so idle ones are always at the front
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session[0] <= self.idle_seconds:
+                break
+            self._evict(session_id)
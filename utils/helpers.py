@@ -1,4 +1,5 @@
 import random
+import numpy as np
 from datetime import datetime, timedelta
 
 def get_income_multiplier(income_range):
@@ -85,13 +86,24 @@ def get_investment_color(inv_type):
     }
     return colors.get(inv_type, '#6B7280')
 
+def goal_totals(user, goals):
+    """(goal count, total target, total saved) from the user's running totals
+    
+    Users created before the totals were kept fall back to summing their goals.
+    """
+    if user.get('goals_count') is not None:
+        return user['goals_count'], user.get('goals_target_total', 0), user.get('goals_current_total', 0)
+    return (len(goals), sum(goal.get('target_amount') or 0 for goal in goals),
+            sum(goal.get('current_amount') or 0 for goal in goals))
+
 def calculate_financial_health_score(user, goals):
     # Simple scoring algorithm
     score = 50  # Base score
     
     # Goal completion rate
-    if goals:
-        completion_rate = sum(goal.get('current_amount', 0) for goal in goals) / sum(goal.get('target_amount', 1) for goal in goals)
+    goal_count, total_target, total_current = goal_totals(user, goals)
+    if goal_count and total_target > 0:
+        completion_rate = total_current / total_target
         score += min(completion_rate * 30, 30)
     
     # Age factor (younger = higher potential)
@@ -115,7 +127,7 @@ def generate_recommendations(user, goals):
     income_range = user.get('monthly_income_range', '15k-30k')
     status = user.get('status', 'student')
     
-    if len(goals) == 0:
+    if goal_totals(user, goals)[0] == 0:
         recommendations.append("🎯 Start by setting your first financial goal to create a clear roadmap")
     
     if income_range in ['0-5k', '5k-15k']:
@@ -134,7 +146,7 @@ def assess_financial_risk(user, goals):
     risk_factors = []
     risk_level = "Low"
     
-    total_goals = len(goals)
+    total_goals = goal_totals(user, goals)[0]
     income_range = user.get('monthly_income_range', '15k-30k')
     
     if total_goals == 0:
@@ -171,13 +183,40 @@ def get_tax_optimization_suggestions(user):
         "health_insurance_deduction": "Claim ₹25,000 under Section 80D"
     }
 
-def compare_with_peers(user, goals):
+def compare_with_peers(user, goals, cohort=None):
+    """Compare the user with their cohort's precomputed statistics (see cohorts.py)"""
     age_bracket = user.get('age_bracket', '19-22')
     status = user.get('status', 'student')
-    
-    return {
-        "savings_vs_peers": "15% above average",
-        "goal_count_vs_peers": "Similar to peers",
+    comparison = {
+        "savings_vs_peers": "Not enough peers to compare yet",
+        "goal_count_vs_peers": "Not enough peers to compare yet",
         "investment_diversification": "Below average - consider adding more asset classes",
         "peer_group": f"{status.title()} aged {age_bracket}"
-    }
\ No newline at end of file
+    }
+    if cohort is None:
+        return comparison
+    
+    goal_count, _, saved = goal_totals(user, goals)
+    mean_savings = cohort['mean_savings']
+    if mean_savings > 0:
+        difference = (saved - mean_savings) / mean_savings * 100
+        comparison["savings_vs_peers"] = (f"{abs(difference):.0f}% {'above' if difference > 0 else 'below'} average"
+                                          if abs(difference) >= 5 else "In line with average")
+    else:
+        comparison["savings_vs_peers"] = "Above average" if saved > 0 else "In line with average"
+    
+    if goal_count > cohort['mean_goals'] + 0.5:
+        comparison["goal_count_vs_peers"] = "More goals than peers"
+    elif goal_count < cohort['mean_goals'] - 0.5:
+        comparison["goal_count_vs_peers"] = "Fewer goals than peers"
+    else:
+        comparison["goal_count_vs_peers"] = "Similar to peers"
+    
+    percentiles = cohort['percentiles']
+    comparison.update({
+        "savings_percentile": round(float(np.interp(saved, list(percentiles.values()), list(percentiles))), 0),
+        "peer_count": cohort['users'],
+        "peer_median_savings": percentiles[50],
+        "peer_goal_completion_rate": f"{cohort['completion_rate'] * 100:.1f}%"
+    })
+    return comparison
\ No newline at end of file
@@ -0,0 +1,60 @@
+import re
+from collections import Counter
+
+# Keyword combinations are few in practice; the bound only stops crafted input growing the memo
+MAX_MEMOIZED_ROUTES = 4096
+
+def trie_pattern(words):
+    """Regex alternation of `words` folded into a prefix trie, preferring longer words"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 and '' not in node else f"(?:{'|'.join(branches)})"
+        return body + '?' if '' in node else body
+
+    return build(trie)
+
+class KeywordRouter:
+    """Picks the intent whose keywords occur most often in a text, in one regex pass
+
+    `intents` is an ordered list of (intent, keywords). Keywords match as
+    substrings, like `word in text`. Every keyword found counts once for each
+    intent listing it. Ties go to the intent listed first, and texts without
+    any keyword route to None.
+    """
+
+    def __init__(self, intents):
+        self._priority = {}
+        self._intents = {}  # keyword -> intents listing it
+        for position, (intent, keywords) in enumerate(intents):
+            self._priority[intent] = position
+            for keyword in keywords:
+                self._intents.setdefault(keyword, []).append(intent)
+
+        # The scan reports the longest keyword at each match and skips past it, so
+        # a match also counts every keyword it contains ("savings" counts "saving").
+        # Keywords that only overlap across their ends ("budgetax") are not both
+        # counted; that needs words run together without a space.
+        keywords = sorted(self._intents, key=len, reverse=True)
+        self._contains = {keyword: frozenset(other for other in keywords if other in keyword) for keyword in keywords}
+        self._pattern = re.compile(trie_pattern(keywords))
+        self._routes = {frozenset(): None}  # set of keywords found -> intent, filled on first use
+
+    def route(self, text):
+        found = frozenset(self._pattern.findall(text))
+        intent = self._routes.get(found, False)
+        if intent is False:
+            counted = frozenset().union(*(self._contains[keyword] for keyword in found))
+            scores = Counter(intent for keyword in counted for intent in self._intents[keyword])
+            intent = min(scores, key=lambda name: (-scores[name], self._priority[name]))
+            if len(self._routes) < MAX_MEMOIZED_ROUTES:
+                self._routes[found] = intent
+        return intent
@@ -0,0 +1,160 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, contextmanager
+from config import Config
+
+class LLMBusy(Exception):
+    """No LLM slot became free within the queue budget"""
+
+class LLMGate:
+    """Bounded concurrency for upstream LLM calls, with coalescing of identical prompts
+
+    At most `max_concurrent` calls run at once; a caller waits at most
+    `queue_timeout` seconds for a slot before LLMBusy is raised. Callers passing
+    a key that is already in flight wait for that call's result instead of
+    making their own. Threads and the asyncio event loop each get their own
+    `max_concurrent` slots.
+    """
+
+    def __init__(self, max_concurrent=8, queue_timeout=10.0):
+        self.max_concurrent = max_concurrent
+        self.queue_timeout = queue_timeout
+        self.calls = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.active = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.wait_seconds = 0.0
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+        self._async_semaphore = None
+        self._pending = {}        # key -> concurrent.futures.Future
+        self._async_pending = {}  # key -> asyncio.Future
+        self._lock = threading.Lock()
+
+    def _enqueue(self):
+        with self._lock:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+        return time.perf_counter()
+
+    def _dequeue(self, started, acquired):
+        with self._lock:
+            self.waiting -= 1
+            self.wait_seconds += time.perf_counter() - started
+            if acquired:
+                self.active += 1
+                self.calls += 1
+            else:
+                self.rejected += 1
+
+    def _release(self):
+        with self._lock:
+            self.active -= 1
+
+    @contextmanager
+    def slot(self):
+        started = self._enqueue()
+        acquired = False
+        try:
+            acquired = self._semaphore.acquire(timeout=self.queue_timeout)
+        finally:
+            self._dequeue(started, acquired)
+        if not acquired:
+            raise LLMBusy(f"no LLM slot free within {self.queue_timeout}s")
+        try:
+            yield
+        finally:
+            self._release()
+            self._semaphore.release()
+
+    @asynccontextmanager
+    async def aslot(self):
+        if self._async_semaphore is None:
+            self._async_semaphore = asyncio.Semaphore(self.max_concurrent)
+        started = self._enqueue()
+        acquired = False
+        try:
+            await asyncio.wait_for(self._async_semaphore.acquire(), self.queue_timeout)
+            acquired = True
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._dequeue(started, acquired)
+        if not acquired:
+            raise LLMBusy(f"no LLM slot free within {self.queue_timeout}s")
+        try:
+            yield
+        finally:
+            self._release()
+            self._async_semaphore.release()
+
+    def call(self, key, fn):
+        """fn() inside a slot, shared with concurrent callers using the same key
+
+        Returns (result, coalesced); coalesced is True for a caller that waited
+        on another caller's call instead of making its own.
+        """
+        with self._lock:
+            future = self._pending.get(key)
+            leader = future is None
+            if leader:
+                future = self._pending[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result(), True
+
+        try:
+            with self.slot():
+                result = fn()
+            future.set_result(result)
+            return result, False
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    async def acall(self, key, fn):
+        """Async variant of call(); fn returns an awaitable"""
+        future = self._async_pending.get(key)
+        if future is not None:
+            with self._lock:
+                self.coalesced += 1
+            return await asyncio.shield(future), True
+
+        future = self._async_pending[key] = asyncio.get_running_loop().create_future()
+        try:
+            async with self.aslot():
+                result = await fn()
+            future.set_result(result)
+            return result, False
+        except BaseException as e:
+            future.set_exception(e)
+            # Only waiters should see the exception; don't warn when there are none
+            future.exception()
+            raise
+        finally:
+            self._async_pending.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "queue_timeout_seconds": self.queue_timeout,
+                "active": self.active,
+                "queue_depth": self.waiting,
+                "max_queue_depth": self.max_waiting,
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "rejected": self.rejected,
+                "avg_queue_wait_seconds": round(self.wait_seconds / (self.calls + self.rejected), 4)
+                                          if self.calls + self.rejected else 0.0
+            }
+
+# Shared by every chat request in the process
+llm_gate = LLMGate(max_concurrent=Config.LLM_MAX_CONCURRENCY, queue_timeout=Config.LLM_QUEUE_TIMEOUT)
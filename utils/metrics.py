@@ -0,0 +1,126 @@
+import threading
+from bisect import bisect_left
+
+# Seconds; covers sub-millisecond API calls up to slow LLM completions
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def format_labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(int(value))
+
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, *labels):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        with self._lock:
+            values = list(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{format_labels(self.labelnames, labels)} {format_value(value)}" for labels, value in values]
+        return lines
+
+class Histogram:
+    """Fixed-bucket latency histogram; observe() is one bisect and a few additions under a lock"""
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        series = self._series.get(labels)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(labels, [[0] * (len(self.buckets) + 1), 0.0, 0])
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        with self._lock:
+            snapshot = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._series.items()]
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.labelnames, labels)} {format_value(total)}")
+            lines.append(f"{self.name}_count{format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+class MetricsRegistry:
+    """Counters and histograms updated as requests run, plus gauges read at scrape time
+
+    A gauge collector is a callable returning (name, help, [(labels dict, value), ...])
+    tuples; collectors that raise are skipped so one broken source never hides the rest.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, help, labelnames=()):
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, help, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector):
+        self._collectors.append(collector)
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines += metric.render()
+        for collector in self._collectors:
+            try:
+                gauges = list(collector())
+            except Exception:
+                continue
+            for name, help, samples in gauges:
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+                for labels, value in samples:
+                    lines.append(f"{name}{format_labels(labels.keys(), labels.values())} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.histogram(
+    'finbuddy_http_request_duration_seconds', 'Flask request latency by route', ('method', 'route', 'status')
+)
+mongo_command_duration = registry.histogram(
+    'finbuddy_mongo_command_duration_seconds', 'MongoDB command latency', ('command', 'outcome')
+)
+llm_request_duration = registry.histogram(
+    'finbuddy_llm_request_duration_seconds', 'Upstream LLM call latency', ('mode',)
+)
+llm_prompt_tokens = registry.counter('finbuddy_llm_prompt_tokens_total', 'Prompt tokens sent to the LLM')
+llm_completion_tokens = registry.counter('finbuddy_llm_completion_tokens_total', 'Completion tokens returned by the LLM')
+chat_replies = registry.counter('finbuddy_chat_replies_total', 'Chat replies by source', ('source',))
@@ -0,0 +1,115 @@
+import hashlib
+import re
+import threading
+import numpy as np
+from config import Config
+from utils.cache import TTLCache
+
+WORD_PATTERN = re.compile(r"[a-z0-9₹]+")
+STOPWORDS = frozenset("""
+a an the i me my we our you your is are am was be to of in on for and or with how what
+which should can could do does will would please tell about some any it this that
+""".split())
+EMBEDDING_DIMENSIONS = 512
+
+def normalize_question(message):
+    """Lowercased words without punctuation or filler, so trivially different phrasings share a key"""
+    return " ".join(word for word in WORD_PATTERN.findall(message.lower()) if word not in STOPWORDS)
+
+def profile_bucket(user_context):
+    """Answers are only shared between users with the same status and income range"""
+    return (user_context.get('status') or '', user_context.get('monthly_income_range') or '')
+
+def _feature(text):
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=4).digest(), 'little') % EMBEDDING_DIMENSIONS
+
+def embed(normalized):
+    """Unit-length hashed bag of words and character trigrams; cheap and entirely local"""
+    vector = np.zeros(EMBEDDING_DIMENSIONS, dtype=np.float32)
+    for word in normalized.split():
+        vector[_feature(word)] += 2.0
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            vector[_feature(padded[i:i + 3])] += 1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+class ResponseCache:
+    """LLM answers keyed by (profile bucket, normalized question)
+
+    Entries expire after `ttl` seconds and the least recently used are evicted
+    beyond `maxsize`. With `similarity` > 0 a miss falls back to the most similar
+    cached question of the same profile bucket whose cosine similarity reaches
+    the threshold. Each hit adds the original LLM latency to `saved_seconds`.
+    """
+
+    def __init__(self, maxsize=2048, ttl=3600, similarity=0.0):
+        self.similarity = similarity
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)  # (bucket, question) -> (answer, latency, vector)
+        self._lock = threading.Lock()
+
+    def get(self, message, user_context):
+        bucket = profile_bucket(user_context)
+        question = normalize_question(message)
+        entry = self._entries.get((bucket, question)) if question else None
+        kind = 'exact'
+        if entry is None and question and self.similarity > 0:
+            entry = self._most_similar(bucket, question)
+            kind = 'similar'
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            if kind == 'exact':
+                self.exact_hits += 1
+            else:
+                self.similar_hits += 1
+            self.saved_seconds += entry[1]
+        return entry[0]
+
+    def set(self, message, user_context, answer, latency):
+        question = normalize_question(message)
+        if not question:
+            return
+        vector = embed(question) if self.similarity > 0 else None
+        self._entries.set((profile_bucket(user_context), question), (answer, latency, vector))
+
+    def _most_similar(self, bucket, question):
+        candidates = [entry for _, entry in self._entries.items(bucket) if entry[2] is not None]
+        if not candidates:
+            return None
+        scores = np.stack([entry[2] for entry in candidates]) @ embed(question)
+        best = int(np.argmax(scores))
+        return candidates[best] if scores[best] >= self.similarity else None
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        entries = self._entries.stats()
+        with self._lock:
+            hits = self.exact_hits + self.similar_hits
+            lookups = hits + self.misses
+            return {
+                "size": entries["size"],
+                "maxsize": entries["maxsize"],
+                "ttl_seconds": entries["ttl_seconds"],
+                "evictions": entries["evictions"],
+                "similarity_threshold": self.similarity,
+                "hits": hits,
+                "exact_hits": self.exact_hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "saved_llm_seconds": round(self.saved_seconds, 3)
+            }
+
+# First-turn chat answers shared across sessions
+response_cache = ResponseCache(
+    maxsize=Config.CHAT_CACHE_SIZE, ttl=Config.CHAT_CACHE_TTL, similarity=Config.CHAT_CACHE_SIMILARITY
+)
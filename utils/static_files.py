@@ -0,0 +1,114 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from flask import Response, send_file
+
+try:
+    import brotli
+except ImportError:  # optional: only on-disk .br files are served without it
+    brotli = None
+
+# Build tools put a content hash in asset names (main.3f9a1c2e.js); those never change
+HASHED_NAME = re.compile(r'\.[0-9a-f]{8,}\.')
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+COMPRESSIBLE = re.compile(r'^(text/|application/(javascript|json|xml|manifest\+json)|image/svg\+xml)')
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+class StaticAsset:
+    __slots__ = ('path', 'mimetype', 'cache_control', 'etag', 'bodies')
+
+    def __init__(self, path, mimetype, cache_control, etag):
+        self.path = path
+        self.mimetype = mimetype
+        self.cache_control = cache_control
+        self.etag = etag
+        self.bodies = {}  # content-coding ('identity', 'br', 'gzip') -> bytes
+
+class StaticAssets:
+    """The React build directory, indexed once at startup
+
+    Files up to `inline_max` bytes are held in memory together with their
+    .br/.gz variants, taken from the build when present and otherwise compressed
+    here (brotli only if installed). Hashed asset names are served as immutable;
+    everything else, index.html included, is revalidated with its ETag.
+    """
+
+    def __init__(self, root, inline_max=2 * 1024 * 1024, precompress=True):
+        self.root = root
+        self.assets = {}
+        self.index = None
+        if not os.path.isdir(root):
+            return
+        for directory, _, names in os.walk(root):
+            for name in names:
+                if name.endswith(('.br', '.gz')):
+                    continue
+                path = os.path.join(directory, name)
+                relative = os.path.relpath(path, root).replace(os.sep, '/')
+                self.assets[relative] = self._load(path, name, inline_max, precompress)
+        self.index = self.assets.get('index.html')
+
+    def _load(self, path, name, inline_max, precompress):
+        mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        cache_control = IMMUTABLE if HASHED_NAME.search(name) else REVALIDATE
+        if os.path.getsize(path) > inline_max:
+            stat = os.stat(path)
+            return StaticAsset(path, mimetype, cache_control, f"{stat.st_mtime_ns:x}-{stat.st_size:x}")
+
+        with open(path, 'rb') as f:
+            body = f.read()
+        asset = StaticAsset(path, mimetype, cache_control, hashlib.blake2b(body, digest_size=12).hexdigest())
+        asset.bodies['identity'] = body
+        for coding, suffix in ENCODINGS:
+            if os.path.exists(path + suffix):
+                with open(path + suffix, 'rb') as f:
+                    asset.bodies[coding] = f.read()
+        if precompress and COMPRESSIBLE.match(mimetype) and len(body) > 1024:
+            if 'gzip' not in asset.bodies:
+                asset.bodies['gzip'] = gzip.compress(body, compresslevel=9, mtime=0)
+            if 'br' not in asset.bodies and brotli is not None:
+                asset.bodies['br'] = brotli.compress(body)
+        # Keep a variant only when it actually saves bytes
+        for coding, _ in ENCODINGS:
+            if coding in asset.bodies and len(asset.bodies[coding]) >= len(body):
+                del asset.bodies[coding]
+        return asset
+
+    def lookup(self, path):
+        """The asset for a URL path; unknown paths get index.html so client-side routes work"""
+        return self.assets.get(path) or self.index
+
+    def response(self, asset, request):
+        if not asset.bodies:
+            response = send_file(asset.path, mimetype=asset.mimetype, conditional=True, etag=asset.etag)
+            response.headers['Cache-Control'] = asset.cache_control
+            return response
+
+        coding = 'identity'
+        for candidate, _ in ENCODINGS:
+            if candidate in asset.bodies and request.accept_encodings[candidate]:
+                coding = candidate
+                break
+        etag = asset.etag if coding == 'identity' else f"{asset.etag}-{coding}"
+
+        headers = {'Cache-Control': asset.cache_control, 'ETag': f'"{etag}"'}
+        if len(asset.bodies) > 1:
+            headers['Vary'] = 'Accept-Encoding'
+        if etag in request.if_none_match:
+            return Response(status=304, headers=headers)
+        if coding != 'identity':
+            headers['Content-Encoding'] = coding
+        return Response(asset.bodies[coding], mimetype=asset.mimetype, headers=headers)
+
+    def stats(self):
+        inline = [asset for asset in self.assets.values() if asset.bodies]
+        return {
+            "files": len(self.assets),
+            "in_memory": len(inline),
+            "bytes": sum(len(asset.bodies['identity']) for asset in inline),
+            "gzip_variants": sum('gzip' in asset.bodies for asset in inline),
+            "br_variants": sum('br' in asset.bodies for asset in inline)
+        }